@@ -1,9 +1,21 @@
+import argparse
+import os
 import sys
 from PyQt5.QtWidgets import QApplication, QMessageBox
 from food_detection import MainWindow
+from frame_source import parse_source
 
 if __name__ == "__main__":
-    app = QApplication(sys.argv)
-    window = MainWindow(model_path="best.pt")
+    parser = argparse.ArgumentParser(description="Smart Refrigerator")
+    # Optional video files / camera indices, one per fridge shelf
+    parser.add_argument("sources", nargs="*", default=["DLIP_Test_Video_Simple2.mp4"])
+    parser.add_argument("--server", help="follow a headless_fridge.py service (host:port) instead of "
+                                         "opening the cameras here")
+    args, qt_args = parser.parse_known_args()
+    app = QApplication(sys.argv[:1] + qt_args)
+    sources = [parse_source(arg) for arg in args.sources]
+    # Shelf zones (zones.json) restrict detection to the shelves when present
+    zones_path = "zones.json" if os.path.exists("zones.json") else None
+    window = MainWindow(model_path="best.pt", sources=sources, zones_path=zones_path, server_url=args.server)
     window.show()
     sys.exit(app.exec())
\ No newline at end of file
@@ -0,0 +1,196 @@
+import argparse
+import csv
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta
+
+import cv2
+
+from detection_engine import DetectionEngine
+from fridge_state import FOOD_MAP, FridgeInventory
+from frame_source import FrameSource
+from inference_backend import BACKENDS
+from shelf_zones import load_zones
+
+FIELDS = [
+    "video", "item", "appeared_s", "disappeared_s", "duration_s", "present_at_end",
+    "detections", "conf_mean", "conf_min", "conf_max", "zones",
+]
+
+
+class PresenceTimeline:
+    # Turns per-frame detections of one video into presence intervals per item.
+    # Appearance is the time FridgeInventory confirms the item (same smoothing as
+    # the live UI); disappearance is the last frame it was detected in.
+    def __init__(self, video, appear_hits=3, appear_window=5, grace_seconds=3.0):
+        self.video = video
+        self.inventory = FridgeInventory(1, appear_hits, appear_window, grace_seconds)
+        self.origin = datetime(2000, 1, 1)
+        self.open = {}
+        self.records = []
+
+    def update(self, seconds, detections):
+        now = self.origin + timedelta(seconds=seconds)
+        for food, start_time in self.inventory.update(0, detections.names, now, detections.zones):
+            if start_time is None:
+                self._close(food, False)
+            elif food not in self.open:
+                self.open[food] = {
+                    "appeared_s": (start_time - self.origin).total_seconds(), "last_seen_s": seconds,
+                    "detections": 0, "conf_sum": 0.0, "conf_min": 1.0, "conf_max": 0.0, "zones": set(),
+                }
+
+        for i, name in enumerate(detections.names):
+            entry = self.open.get(FOOD_MAP[name][0]) if name in FOOD_MAP else None
+            if entry is None:
+                continue
+            conf = float(detections.conf[i])
+            entry["last_seen_s"] = seconds
+            entry["detections"] += 1
+            entry["conf_sum"] += conf
+            entry["conf_min"] = min(entry["conf_min"], conf)
+            entry["conf_max"] = max(entry["conf_max"], conf)
+            if detections.zones is not None:
+                entry["zones"].add(detections.zones[i])
+
+    def finish(self):
+        for food in list(self.open):
+            self._close(food, True)
+        return self.records
+
+    def _close(self, food, at_end):
+        entry = self.open.pop(food, None)
+        if entry is None:
+            return
+        count = entry["detections"]
+        self.records.append({
+            "video": self.video,
+            "item": food,
+            "appeared_s": round(entry["appeared_s"], 3),
+            "disappeared_s": round(entry["last_seen_s"], 3),
+            "duration_s": round(max(0.0, entry["last_seen_s"] - entry["appeared_s"]), 3),
+            "present_at_end": at_end,
+            "detections": count,
+            "conf_mean": round(entry["conf_sum"] / count, 4) if count else None,
+            "conf_min": round(entry["conf_min"], 4) if count else None,
+            "conf_max": round(entry["conf_max"], 4) if count else None,
+            "zones": ";".join(sorted(entry["zones"])),
+        })
+
+
+# One engine (loaded model) per process, reused for every video the process analyses
+_engine = None
+
+
+def get_engine(options):
+    global _engine
+    if _engine is None:
+        _engine = DetectionEngine(
+            options["model"], [], conf_threshold=options["conf"], class_filter=FOOD_MAP.keys(),
+            annotate=False, backend=options["backend"], int8=options["int8"],
+            zones=load_zones(options["zones"]) if options["zones"] else None,
+        )
+    return _engine
+
+
+def analyze_video(video, options):
+    # Runs one video through the detection engine as fast as it decodes; returns
+    # (presence records, frames processed). Runs inside a pool worker.
+    engine = get_engine(options)
+    # The ring must cover a whole batch plus the frame waiting in the queue and the
+    # one being decoded, or the reader runs out of buffers and allocates per frame
+    source = FrameSource(video, mode="fast", ring_size=options["batch_size"] + 2)
+    if not source.is_opened():
+        print(f"Error: Could not open video file '{video}'.")
+        return [], 0
+    fps = source.cap.get(cv2.CAP_PROP_FPS) or 30.0
+
+    timeline = PresenceTimeline(video, options["appear_hits"], options["appear_window"], options["grace_seconds"])
+    frames = 0
+    source.start()
+    while True:
+        batch = []
+        while len(batch) < options["batch_size"]:
+            frame = source.queue.get(timeout=0.5)
+            if frame is None:
+                if source.queue.closed:
+                    break
+                continue
+            batch.append(frame)
+        if not batch:
+            break
+
+        for frame, detections in zip(batch, engine.detect(batch)):
+            timeline.update(frames / fps, detections)
+            source.release(frame)
+            frames += 1
+    source.join()
+    return timeline.finish(), frames
+
+
+def write_records(records, path, fmt=None):
+    fmt = fmt or os.path.splitext(path)[1].lstrip(".").lower()
+    if fmt == "csv":
+        with open(path, 'w', encoding='utf-8', newline='') as f:
+            writer = csv.DictWriter(f, fieldnames=FIELDS)
+            writer.writeheader()
+            writer.writerows(records)
+    elif fmt in ("jsonl", "ndjson"):
+        with open(path, 'w', encoding='utf-8') as f:
+            for record in records:
+                f.write(json.dumps(record) + "\n")
+    elif fmt == "parquet":
+        import pyarrow
+        import pyarrow.parquet
+
+        table = pyarrow.Table.from_pylist(records) if records else pyarrow.table({field: [] for field in FIELDS})
+        pyarrow.parquet.write_table(table, path, compression="zstd")
+    else:
+        raise ValueError(f"Unknown output format '{fmt}' (use csv, jsonl or parquet)")
+
+
+def main():
+    # Audits recorded fridge footage: every frame of every video is analysed
+    # (no GUI, no real-time pacing) into a per-item presence timeline
+    parser = argparse.ArgumentParser(description="Offline Smart Refrigerator video analysis")
+    parser.add_argument("videos", nargs="+")
+    parser.add_argument("--output", default="presence.csv", help=".csv, .jsonl or .parquet")
+    parser.add_argument("--format", choices=["csv", "jsonl", "parquet"], default=None,
+                        help="overrides the format implied by --output")
+    parser.add_argument("--model", default="best.pt")
+    parser.add_argument("--backend", choices=BACKENDS, default="auto")
+    parser.add_argument("--int8", action="store_true",
+                        help="int8-quantized ONNX export (onnxruntime / openvino / auto only)")
+    parser.add_argument("--conf", type=float, default=0.5)
+    parser.add_argument("--batch-size", type=int, default=8)
+    parser.add_argument("--zones", help="shelf zone JSON")
+    parser.add_argument("--appear-hits", type=int, default=3)
+    parser.add_argument("--appear-window", type=int, default=5)
+    parser.add_argument("--grace-seconds", type=float, default=3.0)
+    parser.add_argument("--jobs", type=int, default=1, help="videos analysed in parallel, one process each")
+    args = parser.parse_args()
+
+    options = {
+        "model": args.model, "backend": args.backend, "int8": args.int8, "conf": args.conf,
+        "batch_size": max(1, args.batch_size),
+        "zones": args.zones, "appear_hits": args.appear_hits, "appear_window": args.appear_window,
+        "grace_seconds": args.grace_seconds,
+    }
+    jobs = max(1, min(args.jobs, len(args.videos)))
+    if jobs == 1:
+        results = [analyze_video(video, options) for video in args.videos]
+    else:
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            results = list(pool.map(analyze_video, args.videos, [options] * len(args.videos)))
+
+    records = []
+    for video, (video_records, frames) in zip(args.videos, results):
+        print(f"{video}: {frames} frames, {len(video_records)} presence intervals")
+        records.extend(video_records)
+    write_records(records, args.output, args.format)
+    print(f"Timeline written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,206 @@
+import argparse
+import json
+import os
+import platform
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+
+from inference_backend import BACKENDS
+from metrics import PipelineMetrics
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+
+def peak_rss_mb():
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kilobytes on Linux, bytes on macOS
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def bench_detect(args):
+    # Offline run of the detection loop (no GUI, every frame processed)
+    import cv2
+    from detection_engine import DetectionEngine
+    from fridge_state import FOOD_MAP, FridgeInventory
+    from shelf_zones import load_zones
+
+    engine = DetectionEngine(args.model, [], conf_threshold=args.conf, class_filter=FOOD_MAP.keys(),
+                             annotate=False, backend=args.backend,
+                             zones=load_zones(args.zones) if args.zones else None)
+    results = []
+    for video in args.videos:
+        cap = cv2.VideoCapture(video)
+        if not cap.isOpened():
+            print(f"Error: Could not open video file '{video}'.")
+            continue
+
+        metrics = engine.metrics = PipelineMetrics(window=1_000_000)
+        inventory = FridgeInventory(1)
+        clock = datetime(2000, 1, 1)
+        frames = 0
+        start = time.perf_counter()
+        while args.max_frames is None or frames < args.max_frames:
+            batch = []
+            with metrics.stage("read"):
+                for _ in range(args.batch_size):
+                    ret, frame = cap.read()
+                    if not ret:
+                        break
+                    batch.append(frame)
+            if not batch:
+                break
+
+            with metrics.stage("batch"):
+                for detections in engine.detect(batch):
+                    inventory.update(0, detections.names, clock, detections.zones)
+                    clock += timedelta(seconds=0.1)
+            frames += len(batch)
+        elapsed = time.perf_counter() - start
+        cap.release()
+
+        snapshot = metrics.snapshot()
+        results.append({
+            "video": video,
+            "backend": type(engine.backend).__name__,
+            "batch_size": args.batch_size,
+            "zones": len(engine.zones) if engine.zones else 0,
+            "frames": frames,
+            "seconds": elapsed,
+            "throughput_fps": frames / elapsed if elapsed else 0.0,
+            "stages": snapshot["stages"],
+            "peak_rss_mb": peak_rss_mb(),
+        })
+        print(f"{video}: {frames} frames, {results[-1]['throughput_fps']:.1f} FPS")
+    return results
+
+
+def synthetic_catalog(size, vocabulary_size, rng):
+    # Zipf-like ingredient popularity so some ingredients are shared by many recipes
+    vocabulary = [f"ingredient_{i}" for i in range(vocabulary_size)]
+    weights = [1 / (i + 1) for i in range(vocabulary_size)]
+    catalog = []
+    for i in range(size):
+        required = set(rng.choices(vocabulary, weights, k=rng.randint(2, 6)))
+        optional = set(rng.choices(vocabulary, weights, k=rng.randint(0, 3))) - required
+        catalog.append({
+            "name": f"Recipe {i}",
+            "required_ingredients": sorted(required),
+            "optional_ingredients": sorted(optional),
+            "url": f"https://example.com/recipe/{i}",
+        })
+    return vocabulary, catalog
+
+
+def bench_recommend(args):
+    from recipe_recommender import RecipeRecommender
+    from recipe_store import compile_recipes
+
+    rng = random.Random(args.seed)
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for size in args.sizes:
+            vocabulary, catalog = synthetic_catalog(size, args.vocabulary, rng)
+            recipes_file = os.path.join(tmp, f"recipes_{size}.json")
+            with open(recipes_file, 'w', encoding='utf-8') as f:
+                json.dump(catalog, f)
+            del catalog
+            if args.store:
+                compile_recipes(recipes_file)
+
+            # Peak memory comes from a separate traced load: tracemalloc slows
+            # allocation-heavy code several times over, so the timed load is untraced
+            tracemalloc.start()
+            RecipeRecommender(recipes_file, cache_size=0, use_store=args.store)
+            load_peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+
+            start = time.perf_counter()
+            # cache_size=0: every query is computed, nothing is memoized
+            recommender = RecipeRecommender(recipes_file, cache_size=0, use_store=args.store)
+            load_seconds = time.perf_counter() - start
+
+            for inventory_size in args.inventory_sizes:
+                metrics = PipelineMetrics(window=args.queries)
+                for _ in range(args.queries):
+                    available = rng.sample(vocabulary, min(inventory_size, len(vocabulary)))
+                    start = time.perf_counter()
+                    recommender.get_recommendations(available)
+                    metrics.record("get_recommendations", time.perf_counter() - start)
+                    start = time.perf_counter()
+                    recommender.get_recommendations_with_missing(available)
+                    metrics.record("get_recommendations_with_missing", time.perf_counter() - start)
+                    if args.shopping_budget:
+                        start = time.perf_counter()
+                        recommender.shopping_list(available, args.shopping_budget)
+                        metrics.record("shopping_list", time.perf_counter() - start)
+
+                results.append({
+                    "recipes": size,
+                    "vocabulary": args.vocabulary,
+                    "inventory_size": inventory_size,
+                    "store": args.store,
+                    "load_seconds": load_seconds,
+                    "load_peak_mb": load_peak / (1024 * 1024),
+                    "queries": args.queries,
+                    "stages": metrics.snapshot()["stages"],
+                })
+                stats = results[-1]["stages"]["get_recommendations"]
+                print(f"{size} recipes, {inventory_size} items: load {load_seconds:.2f}s, "
+                      f"query p50 {stats['p50_ms']:.2f} ms / p99 {stats['p99_ms']:.2f} ms")
+            del recommender
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Smart Refrigerator benchmarks")
+    parser.add_argument("--output", default="benchmark_results.json")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    detect = subparsers.add_parser("detect", help="offline detection loop over recorded videos")
+    detect.add_argument("videos", nargs="+")
+    detect.add_argument("--model", default="best.pt")
+    detect.add_argument("--backend", choices=BACKENDS, default="ultralytics")
+    detect.add_argument("--conf", type=float, default=0.5)
+    detect.add_argument("--batch-size", type=int, default=1)
+    detect.add_argument("--max-frames", type=int, default=None)
+    detect.add_argument("--zones", help="shelf zone JSON to benchmark ROI cropping")
+
+    recommend = subparsers.add_parser("recommend", help="RecipeRecommender on synthetic catalogs")
+    recommend.add_argument("--sizes", type=lambda text: [int(v) for v in text.split(",")],
+                           default=[10 ** exp for exp in range(2, 7)])
+    recommend.add_argument("--inventory-sizes", type=lambda text: [int(v) for v in text.split(",")],
+                           default=[5, 20, 50])
+    recommend.add_argument("--vocabulary", type=int, default=300)
+    recommend.add_argument("--queries", type=int, default=200)
+    recommend.add_argument("--seed", type=int, default=0)
+    recommend.add_argument("--store", action="store_true", help="load through the compiled recipe store")
+    recommend.add_argument("--shopping-budget", type=int, default=2,
+                           help="also time shopping_list() with this budget (0 to skip)")
+
+    args = parser.parse_args()
+    results = bench_detect(args) if args.command == "detect" else bench_recommend(args)
+
+    report = {
+        "benchmark": args.command,
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "args": {key: value for key, value in vars(args).items() if key != "output"},
+        "results": results,
+    }
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+    print(f"Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
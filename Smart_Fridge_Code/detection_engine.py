@@ -0,0 +1,182 @@
+import threading
+
+from frame_source import FrameSource, LatestFrameQueue
+from inference_backend import load_backend
+from metrics import PipelineMetrics
+from motion_gate import MotionGate
+from postprocess import draw_detections, empty_detections
+from shelf_zones import crop_zones, draw_zones, merge_zone_detections, model_input_size
+
+
+class DetectionEngine:
+    # Serves several cameras / video files with one model: the latest frame of
+    # each source is collected into a micro-batch and run through a single
+    # batched YOLO call, then the results are handed back per source.
+    # backend selects the inference runtime (see inference_backend.load_backend);
+    # int8 uses the dynamically quantized export for the ONNX backends.
+    # With shelf zones, only the zone crops (or their tiles) are sent to the model
+    # and the boxes are mapped back to full-frame coordinates.
+    # read_mode is the FrameSource read mode ("native", "fixed" or "fast"). Frames
+    # come from each source's ring buffer and are handed back once on_result returns,
+    # unless release_frames is False; the consumer then calls release() itself.
+    def __init__(self, model_path, sources, batch_size=4, interval=None,
+                 conf_threshold=0.5, class_filter=None,
+                 motion_gating=False, gate_interval=5.0, gate_threshold=8.0, annotate=True,
+                 metrics=None, backend="ultralytics", zones=None, read_mode=None, release_frames=True,
+                 int8=False):
+        self.backend = load_backend(model_path, backend, conf_threshold, class_filter, int8=int8)
+        self.metrics = metrics if metrics is not None else PipelineMetrics()
+        self.batch_size = max(1, batch_size)
+        self.conf_threshold = conf_threshold
+        # Headless consumers do not need boxes drawn onto the frames
+        self.annotate = annotate
+        self.class_names = self.backend.names
+        self.zones = zones or None
+        self._cond = threading.Condition()
+        self.frame_sources = [
+            FrameSource(source, LatestFrameQueue(self._cond), interval=interval, metrics=self.metrics,
+                        mode=read_mode)
+            for source in sources
+        ]
+        # Optional per-source gate: static scenes reuse the last detections
+        self.gates = [
+            MotionGate(gate_threshold, gate_interval) for _ in sources
+        ] if motion_gating else None
+        self.last_detections = [empty_detections() for _ in sources]
+        self.release_frames = release_frames
+        self._next_source = 0
+        self._running = False
+
+    def is_opened(self):
+        return all(frame_source.is_opened() for frame_source in self.frame_sources)
+
+    def run(self, on_result):
+        # on_result(source_id, annotated frame, Detections) is called for every
+        # processed frame; returns when all sources have ended or stop() is called.
+        self._running = True
+        for frame_source in self.frame_sources:
+            frame_source.start()
+
+        while self._running:
+            batch = self.next_batch(timeout=0.5)
+            if not batch:
+                if all(frame_source.queue.closed for frame_source in self.frame_sources):
+                    break
+                continue
+
+            with self.metrics.stage("gate"):
+                to_detect = [(source_id, frame) for source_id, frame in batch if self._needs_detection(source_id, frame)]
+            if to_detect:
+                for (source_id, _), detections in zip(to_detect, self.detect([frame for _, frame in to_detect])):
+                    self.last_detections[source_id] = detections
+
+            for source_id, frame in batch:
+                detections = self.last_detections[source_id]
+                if self.annotate:
+                    with self.metrics.stage("draw"):
+                        if self.zones:
+                            draw_zones(frame, self.zones)
+                        draw_detections(frame, detections)
+                on_result(source_id, frame, detections)
+                self.metrics.frame_done()
+                if self.release_frames:
+                    self.release(source_id, frame)
+            self._update_counters()
+
+        for frame_source in self.frame_sources:
+            frame_source.stop()
+
+    def next_batch(self, timeout=None):
+        # Takes at most one (latest) frame per source, starting from a rotating
+        # offset so every source gets a turn when batch_size < number of sources.
+        count = len(self.frame_sources)
+        with self._cond:
+            batch = self._poll_batch(count)
+            if not batch:
+                self._cond.wait(timeout)
+                batch = self._poll_batch(count)
+        return batch
+
+    def _poll_batch(self, count):
+        batch = []
+        for offset in range(count):
+            source_id = (self._next_source + offset) % count
+            frame = self.frame_sources[source_id].queue.poll()
+            if frame is not None:
+                batch.append((source_id, frame))
+                if len(batch) == self.batch_size:
+                    self._next_source = (source_id + 1) % count
+                    break
+        return batch
+
+    def release(self, source_id, frame):
+        # Returns a frame to its source's ring buffer
+        self.frame_sources[source_id].release(frame)
+
+    def _needs_detection(self, source_id, frame):
+        return self.gates is None or self.gates[source_id].should_detect(frame)
+
+    def trigger_detection(self, source_id=None):
+        # Force detection on the next frame, e.g. when a door-open signal arrives
+        if self.gates:
+            for gate in (self.gates if source_id is None else [self.gates[source_id]]):
+                gate.trigger()
+
+    def _update_counters(self):
+        self.metrics.set_counter(
+            "dropped_frames", sum(frame_source.queue.dropped for frame_source in self.frame_sources))
+        self.metrics.set_counter(
+            "ring_misses", sum(frame_source.ring.misses for frame_source in self.frame_sources))
+        if self.gates:
+            self.metrics.set_counter("skipped_frames", sum(gate.skipped for gate in self.gates))
+
+    def skip_rate(self):
+        # Fraction of frames that reused the previous detections instead of running YOLO
+        if not self.gates:
+            return 0.0
+        frames = sum(gate.frames for gate in self.gates)
+        return sum(gate.skipped for gate in self.gates) / frames if frames else 0.0
+
+    def detect(self, frames):
+        if self.zones:
+            return self._detect_zones(frames)
+        with self.metrics.stage("infer"):
+            raw = self.backend.predict(frames)
+        with self.metrics.stage("postprocess"):
+            return self.backend.decode(raw, frames)
+
+    def _detect_zones(self, frames):
+        # Crops of the batch are grouped by zone input size: one model call per
+        # size, run at that size so small zones cost a small model input
+        with self.metrics.stage("crop"):
+            crops, placements, counts, groups = [], [], [], {}
+            for frame in frames:
+                frame_crops, frame_placements = crop_zones(frame, self.zones)
+                for crop, (zone_index, _, _, _) in zip(frame_crops, frame_placements):
+                    imgsz = model_input_size(self.zones[zone_index].input_size)
+                    groups.setdefault(imgsz, []).append(len(crops))
+                    crops.append(crop)
+                placements.append(frame_placements)
+                counts.append(len(frame_crops))
+        if not crops:
+            return [empty_detections() for _ in frames]
+        parts = [None] * len(crops)
+        for imgsz, indices in groups.items():
+            group = [crops[i] for i in indices]
+            with self.metrics.stage("infer"):
+                raw = self.backend.predict(group, imgsz)
+            with self.metrics.stage("postprocess"):
+                for i, detections in zip(indices, self.backend.decode(raw, group)):
+                    parts[i] = detections
+        with self.metrics.stage("postprocess"):
+            detections, start = [], 0
+            for count, frame_placements in zip(counts, placements):
+                detections.append(merge_zone_detections(parts[start:start + count], frame_placements, self.zones))
+                start += count
+            return detections
+
+    def stop(self):
+        self._running = False
+        for frame_source in self.frame_sources:
+            frame_source.stop()
+
@@ -0,0 +1,63 @@
+import threading
+
+from PyQt5.QtCore import QThread, pyqtSignal
+
+from detection_engine import DetectionEngine
+
+
+class DetectionWorker(QThread):
+    # Emits the id of a source with a new result; the receiver collects the
+    # (annotated frame, postprocess.Detections) with take() and hands the frame
+    # back with release() once it is displayed. Results are coalesced per source:
+    # while the GUI is behind only the newest one waits, the frames of the
+    # replaced ones go straight back to the ring and no signals pile up.
+    detections_ready = pyqtSignal(int)
+    stream_ended = pyqtSignal()
+
+    def __init__(self, model_path, sources, batch_size=4, interval=None, read_mode=None,
+                 conf_threshold=0.5, class_filter=None, motion_gating=False, backend="ultralytics",
+                 zones=None, parent=None):
+        super().__init__(parent)
+        self.engine = DetectionEngine(
+            model_path, sources, batch_size=batch_size, interval=interval,
+            conf_threshold=conf_threshold, class_filter=class_filter,
+            motion_gating=motion_gating, backend=backend, zones=zones,
+            read_mode=read_mode, release_frames=False,
+        )
+        self._pending = {}
+        self._pending_lock = threading.Lock()
+
+    def is_opened(self):
+        return self.engine.is_opened()
+
+    def release(self, source_id, frame):
+        self.engine.release(source_id, frame)
+
+    def take(self, source_id):
+        # The newest result of the source as (frame, detections), or None if already taken
+        with self._pending_lock:
+            return self._pending.pop(source_id, None)
+
+    def run(self):
+        self.engine.run(self._publish)
+        self.stream_ended.emit()
+
+    def stop(self):
+        self.engine.stop()
+        self.wait()
+        # Results the GUI never collected
+        with self._pending_lock:
+            pending, self._pending = self._pending, {}
+        for source_id, (frame, _) in pending.items():
+            self.release(source_id, frame)
+
+    def _publish(self, source_id, frame, detections):
+        # Only signal when nothing was waiting for the source: the queued signal
+        # already delivered will pick up the replacement
+        with self._pending_lock:
+            replaced = self._pending.get(source_id)
+            self._pending[source_id] = (frame, detections)
+        if replaced is None:
+            self.detections_ready.emit(source_id)
+        else:
+            self.release(source_id, replaced[0])
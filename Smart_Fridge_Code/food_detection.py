@@ -1,39 +1,36 @@
 import cv2
-from datetime import datetime
+from datetime import datetime, timedelta
 from PyQt5.QtWidgets import (
     QMainWindow, QVBoxLayout, QLabel, QWidget,
-    QTableWidget, QTableWidgetItem, QMessageBox, QPushButton
+    QTableView, QMessageBox, QPushButton
 )
-from PyQt5.QtCore import QTimer, Qt
-from PyQt5.QtGui import QColor
+from PyQt5.QtCore import QThreadPool, QTimer
 
-from ultralytics import YOLO
 import sys
+from detection_worker import DetectionWorker
+from fridge_state import FOOD_EMOTES, FOOD_MAP, FridgeInventory
+from inventory_client import InventoryClient
+from inventory_journal import InventoryJournal
+from inventory_model import InventoryModel
+from shelf_zones import load_zones
+from tracker import InstanceTracker
 from recipe_recommender import RecipeRecommender
+from recipe_worker import ShoppingListTask
 from recipe_window import RecipeWindow
 from additional_recipe_window import AdditionalRecipeWindow
 
-# Food detection information
-FOOD = {
-    "apple": ["", 0, None], 
-    "banana": ["", 0, None], 
-    "bell_pepper": ["", 0, None],
-    "cabage": ["", 0, None], 
-    "carrot": ["", 0, None], "chicken": ["", 0, None],
-    "egg": ["", 0, None], "fork": ["", 0, None], "green": ["", 0, None],
-    "milk": ["", 0, None], "onion": ["", 0, None], "potato": ["", 0, None]
-}
-
-FOOD_MAP = {
-    "apple": ("apple", "🍎"), "banana": ("banana", "🍌"), "bell_pepper": ("bell_pepper", "🫑"),
-    "cabage": ("cabage", "🥬"), "carrot": ("carrot", "🥕"), "chicken": ("chicken", "🍗"),
-    "egg": ("egg", "🥚"), "fork": ("fork", "🍴"), "green": ("green", "🌿"),
-    "milk": ("milk", "🥛"), "onion": ("onion", "🧅"), "potato": ("potato", "🥔")
-}
+
+# Recipe windows only ask the recommender for this many (best ranked) rows
+RECIPE_ROWS = 50
+# Shopping suggestions: sets of at most this many items to buy
+SHOPPING_BUDGET = 2
 
 
 class MainWindow(QMainWindow):
-    def __init__(self, model_path="best.pt"):
+    def __init__(self, model_path="best.pt", sources=("DLIP_Test_Video_Simple2.mp4",), batch_size=4,
+                 conf_threshold=0.5, appear_hits=3, appear_window=5, grace_seconds=3.0,
+                 track_instances=False, motion_gating=False, journal_path="inventory.db",
+                 show_metrics=False, backend="ultralytics", zones_path=None, server_url=None):
         super().__init__()
         self.setWindowTitle("Smart Refrigerator")
         self.setGeometry(200, 200, 800, 600)
@@ -43,16 +40,17 @@ class MainWindow(QMainWindow):
         self.label.setStyleSheet("font-size: 20px; font-weight: bold; margin-bottom: 10px;")
         layout.addWidget(self.label)
 
-        self.table = QTableWidget(0, 4, self)
-        self.table.setHorizontalHeaderLabels([" ", "Name", "Registered Time", "Elapsed Time"])
+        self.inventory = InventoryModel(self)
+        self.table = QTableView(self)
+        self.table.setModel(self.inventory)
         self.table.horizontalHeader().setStretchLastSection(True)
         self.table.verticalHeader().setVisible(False)
-        self.table.setEditTriggers(QTableWidget.NoEditTriggers)
-        self.table.setSelectionMode(QTableWidget.NoSelection)
+        self.table.setEditTriggers(QTableView.NoEditTriggers)
+        self.table.setSelectionMode(QTableView.NoSelection)
         layout.addWidget(self.table)
 
         # Connect table item click event
-        self.table.cellClicked.connect(self.on_table_cell_clicked)
+        self.table.clicked.connect(self.on_table_cell_clicked)
 
         self.recommend_button = QPushButton("Get Current Ingredient Recipe Recommendations", self)
         self.recommend_button.setStyleSheet(
@@ -65,133 +63,136 @@ class MainWindow(QMainWindow):
         central_widget.setLayout(layout)
         self.setCentralWidget(central_widget)
 
-        self.model = YOLO(model_path)
-        self.recipe_recommender = RecipeRecommender("recipes.json")
-
-        self.cap = cv2.VideoCapture("DLIP_Test_Video_Simple2.mp4")
-        if not self.cap.isOpened():
-            QMessageBox.critical(self, "Error", "Could not open video file.")
-            sys.exit()
-
-        self.timer = QTimer()
-        self.timer.timeout.connect(self.detect_from_camera)
-        self.timer.start(100)
+        # Edits to recipes.json are picked up in the background
+        self.recipe_recommender = RecipeRecommender("recipes.json", watch=True)
+
+        # Elapsed times tick at 1 Hz independently of the detection rate
+        self.elapsed_timer = QTimer(self)
+        self.elapsed_timer.timeout.connect(self.inventory.refresh_elapsed)
+
+        self.detection_worker = None
+        self.inventory_client = None
+        self.journal = None
+        if server_url:
+            # Client of a headless_fridge.py service, which owns the cameras, the
+            # model and the journal; the table follows its WebSocket snapshot / diffs
+            self.inventory_client = InventoryClient(server_url)
+            self.inventory_client.items_received.connect(self.on_remote_items)
+            self.inventory_client.connection_changed.connect(self.on_connection_changed)
+            self.inventory_client.start()
+        else:
+            # One inventory per camera / shelf; the table shows them merged
+            self.sources = list(sources)
+            # Single-frame misses are smoothed out before they reach the inventory;
+            # registration times are journaled so they survive a restart
+            self.journal = InventoryJournal(journal_path) if journal_path else None
+            self.fridge = FridgeInventory(
+                len(self.sources), appear_hits, appear_window, grace_seconds, journal=self.journal,
+            )
+            self.instance_trackers = [InstanceTracker() for _ in self.sources] if track_instances else None
+
+            # YOLO inference and video capture run on a background thread;
+            # with shelf zones only the zone crops are run through the model
+            self.detection_worker = DetectionWorker(
+                model_path, self.sources, batch_size=batch_size,
+                conf_threshold=conf_threshold, class_filter=FOOD_MAP.keys(),
+                motion_gating=motion_gating, backend=backend,
+                zones=load_zones(zones_path) if zones_path else None,
+            )
+            if not self.detection_worker.is_opened():
+                QMessageBox.critical(self, "Error", "Could not open video file.")
+                sys.exit()
+
+            self.detection_worker.detections_ready.connect(self.on_detections)
+            self.detection_worker.stream_ended.connect(self.on_stream_ended)
+            self.detection_worker.start()
+
+            # Per-stage latency overlay on the preview window
+            self.show_metrics = show_metrics
+            self.metrics = self.detection_worker.engine.metrics
+            if motion_gating:
+                self.elapsed_timer.timeout.connect(self.show_skip_rate)
+        self.elapsed_timer.start(1000)
 
         self.recipe_window = None
         self.additional_recipe_window = None # Initialize additional recipe window instance
 
-    def detect_from_camera(self):
-        ret, frame = self.cap.read()
-        if not ret:
-            self.timer.stop()
-            self.cap.release()
-            cv2.destroyAllWindows()
-            return
-
-        results = self.model(frame)
-        boxes = results[0].boxes
-        class_names = self.model.names
+        # Shopping suggestions are searched off the GUI thread; only the answer to
+        # the latest click is shown
+        self.shopping_pool = QThreadPool(self)
+        self.shopping_pool.setMaxThreadCount(1)
+        self.shopping_request = 0
 
+    def on_detections(self, source_id):
+        result = self.detection_worker.take(source_id)
+        if result is None:
+            return
+        frame, detections = result
         now = datetime.now()
-        detected_now = set()
-
-        for i in range(len(boxes)):
-            conf = boxes.conf[i].item()
-            if conf < 0.5:
-                continue
-
-            cls_id = int(boxes.cls[i])
-            cls_name = class_names[cls_id]
-
-            if cls_name in FOOD_MAP:
-                food_name, emote = FOOD_MAP[cls_name]
-                detected_now.add(food_name)
-                DOW, SP_delta = self.update_food_info(food_name, now)
-                self.update_ui(food_name, emote, DOW, SP_delta)
-
-            xyxy = boxes.xyxy[i].tolist()
-            x1, y1, x2, y2 = map(int, xyxy)
-            cv2.rectangle(frame, (x1, y1), (x2, y2), (0, 255, 0), 2)
-            label = f"{cls_name} {conf:.2f}"
-            cv2.putText(frame, label, (x1, y1 - 10),
-                                 cv2.FONT_HERSHEY_SIMPLEX, 0.6, (0, 255, 0), 2)
-
-        for food in list(FOOD.keys()):
-            if FOOD[food][1] == 1 and food not in detected_now:
-                FOOD[food][1] = 0
-                FOOD[food][0] = ""
-                FOOD[food][2] = None
-                self.remove_from_ui(food)
-            elif FOOD[food][1] == 1:
-                DOW, SP_delta = self.update_food_info(food, now)
-                self.update_ui(food, FOOD_MAP[food][1], DOW, SP_delta)
-
-        cv2.imshow("Webcam Detection", cv2.resize(frame, (900, 650)))
-        if cv2.waitKey(1) & 0xFF == ord('q'):
+        with self.metrics.stage("update_ui"):
+            # Apply only the foods that changed to the table
+            for food, start_time in self.fridge.update(source_id, detections.names, now, detections.zones):
+                if start_time is None:
+                    self.inventory.remove(food)
+                else:
+                    self.inventory.add(food, FOOD_EMOTES[food], start_time)
+                    self.inventory.set_zones(food, self.fridge.zones_of(food))
+
+            if self.instance_trackers:
+                counts = self.instance_trackers[source_id].update(detections)
+                for food in self.fridge.source_foods(source_id):
+                    self.inventory.set_count(food, counts.get(food, 1))
+
+        with self.metrics.stage("display"):
+            window_name = "Webcam Detection" if len(self.sources) == 1 else f"Webcam Detection {source_id}"
+            preview = cv2.resize(frame, (900, 650))
+            self.detection_worker.release(source_id, frame)
+            if self.show_metrics:
+                self.metrics.draw_overlay(preview)
+            cv2.imshow(window_name, preview)
+            key = cv2.waitKey(1) & 0xFF
+        if key == ord('q'):
             self.close()
 
-    def update_food_info(self, food_name, current_time):
-        now_str = current_time.strftime("%Y-%m-%d %H:%M:%S")
+    def on_remote_items(self, snapshot, items):
+        # Item records from the service; a snapshot replaces the whole table
+        now = datetime.now()
+        present = {item["name"] for item in items if item.get("present")}
+        if snapshot:
+            for food in self.inventory.present_foods():
+                if food not in present:
+                    self.inventory.remove(food)
+        for item in items:
+            if not item.get("present"):
+                self.inventory.remove(item["name"])
+                continue
+            # Registration times follow the service's elapsed time, so clock skew
+            # between the two machines does not show up as age
+            registered_at = now - timedelta(seconds=item.get("elapsed_seconds", 0))
+            self.inventory.add(item["name"], item.get("emote", ""), registered_at.replace(microsecond=0))
+            self.inventory.set_zones(item["name"], item.get("zones", []))
 
-        if FOOD[food_name][1] == 0:
-            FOOD[food_name][1] = 1
-            FOOD[food_name][0] = now_str
-            FOOD[food_name][2] = current_time
-            SP = "0:00:00"
-        else:
-            start_time = FOOD[food_name][2]
-            if start_time:
-                SP_delta = current_time - start_time
-                SP = str(SP_delta).split('.')[0]
-            else:
-                SP = "Error"
-        return FOOD[food_name][0], SP
-
-    def update_ui(self, food_name, emote, DOW, SP):
-        row = self.find_row(food_name)
-        if row == -1:
-            row = self.table.rowCount()
-            self.table.insertRow(row)
-
-        self.table.setItem(row, 0, QTableWidgetItem(emote))
-        self.table.setItem(row, 1, QTableWidgetItem(food_name))
-        self.table.setItem(row, 2, QTableWidgetItem(DOW))
-        self.table.setItem(row, 3, QTableWidgetItem(SP))
-
-        try:
-            start_time = FOOD[food_name][2]
-            if start_time:
-                elapsed_seconds = (datetime.now() - start_time).total_seconds()
-            else:
-                elapsed_seconds = 0
-        except Exception:
-            elapsed_seconds = 0
-
-        for col in range(4):
-            item = self.table.item(row, col)
-            if item:
-                item.setTextAlignment(Qt.AlignCenter)
-                if elapsed_seconds >= 10:
-                    item.setForeground(QColor(255, 0, 0))
-                else:
-                    item.setForeground(QColor(0, 0, 0))
+    def on_connection_changed(self, connected):
+        where = f"{self.inventory_client.host}:{self.inventory_client.port}"
+        self.statusBar().showMessage(f"Connected to {where}" if connected else f"Reconnecting to {where}...")
 
-    def remove_from_ui(self, food_name):
-        row = self.find_row(food_name)
-        if row != -1:
-            self.table.removeRow(row)
+    def show_skip_rate(self):
+        self.statusBar().showMessage(f"Inference skipped: {self.detection_worker.engine.skip_rate():.0%}")
 
-    def find_row(self, food_name):
-        for row in range(self.table.rowCount()):
-            item = self.table.item(row, 1)
-            if item and item.text() == food_name:
-                return row
-        return -1
+    def on_stream_ended(self):
+        cv2.destroyAllWindows()
 
     def show_recipe_recommendations(self):
-        current_ingredients = [food for food, info in FOOD.items() if info[1] == 1]
-        
-        recommended_recipes_data = self.recipe_recommender.get_recommendations(current_ingredients)
+        current_ingredients = self.inventory.present_foods()
+
+        # Ranked by optional-ingredient coverage and how long the used items have been in the fridge
+        # (urgency grows over top_k's default 3-day horizon, not the 10 s alert delay)
+        recommended_recipes_data = {
+            "can_make_now": self.recipe_recommender.top_k(
+                current_ingredients, RECIPE_ROWS, max_missing=0,
+                elapsed_seconds=self.inventory.elapsed_seconds(),
+            )
+        }
 
         if not self.recipe_window:
             self.recipe_window = RecipeWindow()
@@ -201,23 +202,23 @@ class MainWindow(QMainWindow):
         self.recipe_window.show()
 
     # Modify table cell click event handler
-    def on_table_cell_clicked(self, row, column):
+    def on_table_cell_clicked(self, index):
         # Only process if the 'Name' column (index 1) is clicked
-        if column == 1:
-            item = self.table.item(row, column)
-            if item:
+        if index.column() == 1:
+            if index.isValid():
                 # Get all current ingredients, including the clicked ingredient.
-                all_current_ingredients = [food for food, info in FOOD.items() if info[1] == 1]
+                all_current_ingredients = self.inventory.present_foods()
                 
                 # Call the 'Recipes available with additional purchase' recommendation logic
                 # This function finds recipes that can be made if 1-2 more ingredients are purchased in addition to current ingredients.
                 self.show_additional_recipe_recommendations(all_current_ingredients)
 
     def show_additional_recipe_recommendations(self, current_available_ingredients):
-        # The recipe_recommender's get_recommendations_with_missing function now
-        # finds recipes that can be made by purchasing just 1-2 more ingredients, given the "current_available_ingredients".
-        additional_recommended_recipes = self.recipe_recommender.get_recommendations_with_missing(
-            current_available_ingredients
+        # The RECIPE_ROWS best ranked recipes that need 1-2 more ingredients; the
+        # window's filter only searches these rows, and says so
+        additional_recommended_recipes = self.recipe_recommender.top_k(
+            current_available_ingredients, RECIPE_ROWS, max_missing=2, min_missing=1,
+            elapsed_seconds=self.inventory.elapsed_seconds(),
         )
         
         if not self.additional_recipe_window:
@@ -226,11 +227,32 @@ class MainWindow(QMainWindow):
         # Pass appropriate title and recipe data to AdditionalRecipeWindow's update_recipes function
         # The clicked_food_name is no longer needed, so pass an empty string or other appropriate value.
         self.additional_recipe_window.update_recipes("", additional_recommended_recipes)
+        self.additional_recipe_window.update_shopping_list([])
         self.additional_recipe_window.show()
 
+        self.shopping_request += 1
+        task = ShoppingListTask(
+            self.recipe_recommender, self.shopping_request, current_available_ingredients, SHOPPING_BUDGET, 3,
+        )
+        task.signals.finished.connect(self.on_shopping_list)
+        self.shopping_pool.start(task)
+
+    def on_shopping_list(self, request_id, suggestions):
+        if request_id == self.shopping_request and self.additional_recipe_window:
+            self.additional_recipe_window.update_shopping_list(suggestions)
+
 
     def closeEvent(self, event):
-        self.cap.release()
+        self.elapsed_timer.stop()
+        if self.detection_worker:
+            self.detection_worker.stop()
+        if self.inventory_client:
+            self.inventory_client.stop()
+        self.shopping_pool.waitForDone()
+        self.recipe_recommender.close()
+        if self.journal:
+            self.fridge.close(datetime.now())
+            self.journal.close()
         cv2.destroyAllWindows()
         if self.recipe_window:
             self.recipe_window.close()
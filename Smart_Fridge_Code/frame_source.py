@@ -0,0 +1,247 @@
+import threading
+import time
+
+import cv2
+import numpy as np
+
+
+def parse_source(source):
+    # Device indices ("0", "1") open cameras, anything else is a file or URL
+    if isinstance(source, str) and source.isdigit():
+        return int(source)
+    return source
+
+
+class FrameRing:
+    # Fixed pool of preallocated frame arrays that the capture thread decodes into,
+    # so steady-state capture does not allocate. Slots are handed out by acquire()
+    # and come back through release() once the consumer is done with the frame;
+    # a frame of another shape (e.g. after a reconnect) re-sizes the pool.
+    def __init__(self, size=4):
+        self.size = size
+        self._slots = {}
+        self._free = []
+        self._lock = threading.Lock()
+        self.misses = 0
+
+    def prepare(self, shape, dtype=np.uint8):
+        # (Re)allocates the slots for frames of this shape
+        with self._lock:
+            if self._slots and next(iter(self._slots.values())).shape == shape:
+                return
+            self._slots, self._free = {}, []
+            for _ in range(self.size):
+                frame = np.empty(shape, dtype=dtype)
+                self._slots[id(frame)] = frame
+                self._free.append(frame)
+
+    def acquire(self):
+        # Returns a free array, or None before the first frame or when every slot is in use
+        with self._lock:
+            if self._free:
+                return self._free.pop()
+            if self._slots:
+                self.misses += 1
+            return None
+
+    def release(self, frame):
+        # Frames that are not ring slots (fallback allocations) are simply dropped
+        if frame is None:
+            return
+        with self._lock:
+            if self._slots.get(id(frame)) is frame:
+                self._free.append(frame)
+
+
+class LatestFrameQueue:
+    # Bounded queue of size 1: a new frame replaces the one nobody took yet,
+    # so a slow consumer always gets the most recent frame instead of a backlog.
+    # Several queues may share one Condition so a consumer can wait on all of them.
+    def __init__(self, cond=None):
+        self._cond = cond if cond is not None else threading.Condition()
+        self._frame = None
+        self._closed = False
+        self.dropped = 0
+
+    def put(self, frame):
+        # Returns the frame it replaced (None if there was none)
+        with self._cond:
+            replaced = self._frame
+            if replaced is not None:
+                self.dropped += 1
+            self._frame = frame
+            self._cond.notify_all()
+            return replaced
+
+    def get(self, timeout=None):
+        # Returns None once the queue is closed and drained (or on timeout).
+        with self._cond:
+            if self._frame is None and not self._closed:
+                self._cond.wait(timeout)
+            return self._take()
+
+    def poll(self):
+        with self._cond:
+            return self._take()
+
+    def _take(self):
+        frame = self._frame
+        self._frame = None
+        if frame is not None:
+            # Wakes a producer waiting in wait_taken()
+            self._cond.notify_all()
+        return frame
+
+    def wait_taken(self, timeout=None):
+        # True once the consumer has taken the pending frame
+        with self._cond:
+            return self._cond.wait_for(lambda: self._frame is None, timeout)
+
+    def close(self):
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+
+    @property
+    def closed(self):
+        with self._cond:
+            return self._closed and self._frame is None
+
+
+def is_live(source):
+    # Cameras and network streams can drop out and come back; files just end
+    return isinstance(source, int) or "://" in str(source)
+
+
+class FrameSource(threading.Thread):
+    # Owns a cv2.VideoCapture and decodes ahead on its own thread into a FrameRing,
+    # pushing frames into a LatestFrameQueue. Consumers hand frames back with release().
+    # Read modes:
+    #   "native": every frame, files paced at their own FPS (cameras deliver at theirs)
+    #   "fixed":  1 / interval frames per second; skipped frames are only grabbed, not decoded
+    #   "fast":   every frame as fast as the consumer takes them (offline processing, nothing dropped)
+    # Live sources reconnect with exponential backoff after a failed read.
+    MODES = ("native", "fixed", "fast")
+
+    def __init__(self, source, queue=None, interval=None, metrics=None, mode=None, ring_size=4,
+                 reconnect=None, reconnect_delay=0.5, max_reconnect_delay=10.0, max_reconnects=None):
+        super().__init__(daemon=True)
+        self.source = source
+        self.interval = interval
+        self.mode = mode or ("fixed" if interval else "native")
+        if self.mode not in self.MODES:
+            raise ValueError(f"Unknown read mode '{self.mode}'")
+        if self.mode == "fixed" and not interval:
+            raise ValueError("Fixed-rate reading needs an interval")
+        self.metrics = metrics
+        self.queue = queue if queue is not None else LatestFrameQueue()
+        self.ring = FrameRing(ring_size)
+        self.live = is_live(source)
+        self.reconnect = self.live if reconnect is None else reconnect
+        self.reconnect_delay = reconnect_delay
+        self.max_reconnect_delay = max_reconnect_delay
+        self.max_reconnects = max_reconnects
+        self.reconnects = 0
+        self.cap = cv2.VideoCapture(source)
+        self._stop_event = threading.Event()
+
+    def is_opened(self):
+        return self.cap.isOpened()
+
+    def release(self, frame):
+        self.ring.release(frame)
+
+    def run(self):
+        try:
+            while not self._stop_event.is_set():
+                self._stream()
+                if self._stop_event.is_set() or not self.reconnect or not self._reopen():
+                    break
+        finally:
+            self.cap.release()
+            self.queue.close()
+
+    def _stream(self):
+        # Reads until the stream ends or fails
+        fps = self.cap.get(cv2.CAP_PROP_FPS)
+        fps = fps if 0 < fps <= 240 else None
+        period = None
+        skip = 0
+        if self.mode == "native" and not self.live:
+            period = 1 / fps if fps else None
+        elif self.mode == "fixed":
+            period = self.interval
+            if not self.live and fps:
+                skip = max(0, round(fps * self.interval) - 1)
+
+        due = time.perf_counter()
+        while not self._stop_event.is_set():
+            if self.live and self.mode == "fixed":
+                # Keep the camera buffer fresh; only decode the frame that is due
+                if not self.cap.grab():
+                    return
+                if time.perf_counter() < due:
+                    continue
+            else:
+                for _ in range(skip):
+                    if not self.cap.grab():
+                        return
+                if not self.cap.grab():
+                    return
+
+            frame = self._retrieve()
+            if frame is None:
+                return
+            if self.mode == "fast":
+                # Nothing is dropped: decode one frame ahead, then wait for the consumer
+                while not self.queue.wait_taken(0.1):
+                    if self._stop_event.is_set():
+                        self.ring.release(frame)
+                        return
+            self.ring.release(self.queue.put(frame))
+
+            if period:
+                due += period
+                delay = due - time.perf_counter()
+                if delay < -period:
+                    # Fell behind (slow decode): restart the schedule instead of bursting
+                    due = time.perf_counter()
+                elif delay > 0 and not self.live:
+                    self._stop_event.wait(delay)
+
+    def _retrieve(self):
+        buffer = self.ring.acquire()
+        if self.metrics is not None:
+            with self.metrics.stage("read"):
+                ret, frame = self.cap.retrieve(buffer) if buffer is not None else self.cap.retrieve()
+        else:
+            ret, frame = self.cap.retrieve(buffer) if buffer is not None else self.cap.retrieve()
+        if not ret:
+            self.ring.release(buffer)
+            return None
+        if frame is not buffer:
+            # First frame (or a new resolution): size the ring from it
+            self.ring.release(buffer)
+            self.ring.prepare(frame.shape, frame.dtype)
+        return frame
+
+    def _reopen(self):
+        delay = self.reconnect_delay
+        while not self._stop_event.is_set():
+            if self.max_reconnects is not None and self.reconnects >= self.max_reconnects:
+                print(f"Error: Could not reconnect to video source '{self.source}'.")
+                return False
+            self.reconnects += 1
+            if self.metrics is not None:
+                self.metrics.increment("reconnects")
+            self.cap.release()
+            if self._stop_event.wait(delay):
+                return False
+            self.cap = cv2.VideoCapture(self.source)
+            if self.cap.isOpened():
+                return True
+            delay = min(delay * 2, self.max_reconnect_delay)
+        return False
+
+    def stop(self):
+        self._stop_event.set()
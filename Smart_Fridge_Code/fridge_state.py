@@ -0,0 +1,199 @@
+from tracker import PresenceTracker
+
+FOOD_MAP = {
+    "apple": ("apple", "🍎"), "banana": ("banana", "🍌"), "bell_pepper": ("bell_pepper", "🫑"),
+    "cabage": ("cabage", "🥬"), "carrot": ("carrot", "🥕"), "chicken": ("chicken", "🍗"),
+    "egg": ("egg", "🥚"), "fork": ("fork", "🍴"), "green": ("green", "🌿"),
+    "milk": ("milk", "🥛"), "onion": ("onion", "🧅"), "potato": ("potato", "🥔")
+}
+FOODS = [food_name for food_name, _ in FOOD_MAP.values()]
+FOOD_EMOTES = dict(FOOD_MAP.values())
+
+
+class FridgeState:
+    # Inventory of a single camera / shelf: food -> [registered time string, present flag, registered datetime]
+    def __init__(self, foods):
+        self.items = {food: ["", 0, None] for food in foods}
+
+    def update(self, detected_foods, current_time):
+        # Returns the foods that appeared and disappeared in this frame
+        added, removed = [], []
+        for food, info in self.items.items():
+            if food in detected_foods:
+                if info[1] == 0:
+                    info[0] = current_time.strftime("%Y-%m-%d %H:%M:%S")
+                    info[1] = 1
+                    info[2] = current_time
+                    added.append(food)
+            elif info[1] == 1:
+                info[0] = ""
+                info[1] = 0
+                info[2] = None
+                removed.append(food)
+        return added, removed
+
+    def set_registered_at(self, food, registered_at):
+        info = self.items[food]
+        info[0] = registered_at.strftime("%Y-%m-%d %H:%M:%S")
+        info[2] = registered_at
+
+    def registered_at(self, food):
+        info = self.items.get(food)
+        return info[2] if info and info[1] == 1 else None
+
+    def present_foods(self):
+        return [food for food, info in self.items.items() if info[1] == 1]
+
+
+def earliest_registration(states, food):
+    # Registration time of a food across several shelves (the oldest one wins)
+    times = [state.registered_at(food) for state in states]
+    times = [t for t in times if t is not None]
+    return min(times) if times else None
+
+
+class FridgeInventory:
+    # Qt-free inventory of the whole fridge: one smoothed FridgeState per shelf
+    # (camera, or shelf zone of a camera), merged into food -> registration time
+    # (the oldest shelf wins) and food -> zones it is currently seen in.
+    # Changes are recorded to an optional InventoryJournal; registration times
+    # restored from it are reused when a food is seen again within restore_window seconds.
+    def __init__(self, source_count, appear_hits=3, appear_window=5, grace_seconds=3.0,
+                 journal=None, restore_window=60.0):
+        self.appear_hits = appear_hits
+        self.appear_window = appear_window
+        self.grace_seconds = grace_seconds
+        # (source_id, zone name or None) -> FridgeState / PresenceTracker, created on first sight
+        self.states = {}
+        self.trackers = {}
+        self._source_zones = [set() for _ in range(source_count)]
+        self.items = {}
+        self.locations = {}
+        self.journal = journal
+        self.restore_window = restore_window
+        self._restored = journal.restore() if journal is not None else {}
+        self._restore_deadline = None
+
+    def update(self, source_id, class_names, current_time, zone_names=None):
+        # Applies one frame of detections; zone_names (parallel to class_names)
+        # splits them per shelf zone. Returns the merged changes as
+        # [(food, registration time or None when it left the fridge), ...];
+        # a food that only moved to another zone is reported again with its time.
+        detected_by_zone = {}
+        for i, cls_name in enumerate(class_names):
+            if cls_name in FOOD_MAP:
+                zone = zone_names[i] if zone_names is not None else None
+                detected_by_zone.setdefault(zone, set()).add(FOOD_MAP[cls_name][0])
+
+        zones = self._source_zones[source_id]
+        zones.update(detected_by_zone)
+        if not zones:
+            zones.add(None)
+
+        touched = set()
+        for zone in zones:
+            state = self._shelf(source_id, zone)
+            present = self.trackers[(source_id, zone)].update(detected_by_zone.get(zone, set()), current_time)
+            added, removed = state.update(present, current_time)
+            for food in added:
+                # Moving to another shelf keeps the original registration time
+                if food in self.items:
+                    state.set_registered_at(food, self.items[food])
+            if self._restored:
+                self._apply_restored(state, added, current_time)
+            touched.update(added)
+            touched.update(removed)
+
+        changes = []
+        for food in touched:
+            start_time = earliest_registration(self.states.values(), food)
+            if start_time is None:
+                self.locations.pop(food, None)
+                if self.items.pop(food, None) is not None:
+                    changes.append((food, None))
+                    if self.journal is not None:
+                        self.journal.record(food, None, current_time)
+                continue
+
+            locations = self._locate(food)
+            if self.items.get(food) != start_time:
+                self.items[food] = start_time
+                self.locations[food] = locations
+                changes.append((food, start_time))
+                if self.journal is not None:
+                    self.journal.record(food, start_time, current_time)
+            elif self.locations.get(food) != locations:
+                self.locations[food] = locations
+                changes.append((food, start_time))
+        return changes
+
+    def _shelf(self, source_id, zone):
+        key = (source_id, zone)
+        state = self.states.get(key)
+        if state is None:
+            state = self.states[key] = FridgeState(FOODS)
+            self.trackers[key] = PresenceTracker(self.appear_hits, self.appear_window, self.grace_seconds)
+        return state
+
+    def _locate(self, food):
+        return sorted(zone for (_, zone), state in self.states.items()
+                      if zone is not None and state.registered_at(food) is not None)
+
+    def _apply_restored(self, state, added, current_time):
+        if self._restore_deadline is None:
+            self._restore_deadline = current_time.timestamp() + self.restore_window
+        if current_time.timestamp() > self._restore_deadline:
+            self._expire_restored(current_time)
+            return
+        for food in added:
+            registered_at = self._restored.pop(food, None)
+            if registered_at is not None:
+                state.set_registered_at(food, registered_at)
+
+    def _expire_restored(self, current_time):
+        # Restored foods that were not seen again have left the fridge meanwhile;
+        # journal their removal so a later restart does not bring them back
+        if self.journal is not None:
+            for food in self._restored:
+                if food not in self.items:
+                    self.journal.record(food, None, current_time)
+        self._restored = {}
+
+    def close(self, current_time):
+        # Clean shutdown: the journal ends up holding exactly the current items
+        self._expire_restored(current_time)
+
+    def present_foods(self):
+        return list(self.items)
+
+    def source_foods(self, source_id):
+        # Foods currently present on any shelf zone of one camera
+        foods = set()
+        for zone in self._source_zones[source_id]:
+            foods.update(self.states[(source_id, zone)].present_foods())
+        return foods
+
+    def elapsed_seconds(self, current_time):
+        # {food: seconds in the fridge}
+        return {food: (current_time - start_time).total_seconds() for food, start_time in self.items.items()}
+
+    def zones_of(self, food):
+        return self.locations.get(food, [])
+
+    def snapshot(self, current_time):
+        return [item_record(food, start_time, current_time, self.zones_of(food))
+                for food, start_time in self.items.items()]
+
+
+def item_record(food, start_time, current_time, zones=()):
+    # JSON-friendly description of one inventory item
+    if start_time is None:
+        return {"name": food, "present": False}
+    return {
+        "name": food,
+        "emote": FOOD_EMOTES.get(food, ""),
+        "present": True,
+        "registered": start_time.strftime("%Y-%m-%d %H:%M:%S"),
+        "elapsed_seconds": max(0, int((current_time - start_time).total_seconds())),
+        "zones": list(zones),
+    }
@@ -0,0 +1,85 @@
+import argparse
+import asyncio
+import threading
+from datetime import datetime
+
+from detection_engine import DetectionEngine
+from fridge_state import FOOD_MAP, FridgeInventory
+from frame_source import FrameSource, parse_source
+from inference_backend import BACKENDS
+from inventory_journal import InventoryJournal
+from inventory_server import InventoryServer
+from recipe_recommender import RecipeRecommender
+from shelf_zones import load_zones
+
+
+def main():
+    # Capture -> YOLO -> inventory without Qt; dashboards read it over HTTP / WebSocket
+    parser = argparse.ArgumentParser(description="Headless Smart Refrigerator")
+    parser.add_argument("sources", nargs="*", default=["DLIP_Test_Video_Simple2.mp4"],
+                        help="video files or camera indices, one per shelf")
+    parser.add_argument("--model", default="best.pt")
+    parser.add_argument("--backend", choices=BACKENDS, default="auto",
+                        help="inference runtime; auto prefers an exported ONNX model on CPU")
+    parser.add_argument("--int8", action="store_true",
+                        help="int8-quantized ONNX export (onnxruntime / openvino / auto only)")
+    parser.add_argument("--recipes", default="recipes.json")
+    parser.add_argument("--host", default="127.0.0.1",
+                        help="there is no authentication: only use 0.0.0.0 on a trusted network")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--allow-origin", default=None,
+                        help="Access-Control-Allow-Origin for browser dashboards on another origin")
+    parser.add_argument("--batch-size", type=int, default=4)
+    parser.add_argument("--interval", type=float, default=0.1, help="seconds between frames per source")
+    parser.add_argument("--read-mode", choices=FrameSource.MODES, default=None,
+                        help="native FPS, fixed rate (--interval) or as fast as possible; default fixed")
+    parser.add_argument("--conf", type=float, default=0.5)
+    parser.add_argument("--motion-gating", action="store_true")
+    parser.add_argument("--journal", default="inventory.db", help="inventory journal path ('' to disable)")
+    parser.add_argument("--zones", help="shelf zone JSON; detection runs on the zone crops only")
+    args = parser.parse_args()
+
+    sources = [parse_source(source) for source in args.sources]
+    engine = DetectionEngine(
+        args.model, sources, batch_size=args.batch_size, interval=args.interval,
+        conf_threshold=args.conf, class_filter=FOOD_MAP.keys(), motion_gating=args.motion_gating,
+        annotate=False, backend=args.backend, int8=args.int8, read_mode=args.read_mode,
+        zones=load_zones(args.zones) if args.zones else None,
+    )
+    if not engine.is_opened():
+        raise SystemExit("Error: Could not open video source.")
+
+    recommender = RecipeRecommender(args.recipes, watch=True)
+    journal = InventoryJournal(args.journal) if args.journal else None
+    inventory = FridgeInventory(len(sources), journal=journal)
+    server = InventoryServer(
+        inventory, recommender, args.host, args.port,
+        metrics=engine.metrics, allow_origin=args.allow_origin,
+    )
+
+    async def run():
+        await server.start()
+        detection_thread = threading.Thread(
+            target=engine.run,
+            args=(lambda source_id, frame, detections: server.submit(
+                source_id, detections.names, datetime.now(), detections.zones),),
+            daemon=True,
+        )
+        detection_thread.start()
+        try:
+            await server.serve_forever()
+        finally:
+            engine.stop()
+            recommender.close()
+            if journal:
+                inventory.close(datetime.now())
+                journal.close()
+
+    try:
+        asyncio.run(run())
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,244 @@
+import abc
+import hashlib
+import importlib
+import json
+import os
+import shutil
+
+import cv2
+import numpy as np
+
+from postprocess import class_mask, filter_detections, names_list, postprocess
+
+BACKENDS = ("auto", "ultralytics", "onnxruntime", "openvino")
+
+
+class UltralyticsBackend:
+    # The original PyTorch path; also the fallback for every other backend
+    def __init__(self, model_path, conf_threshold=0.5, class_filter=None):
+        from ultralytics import YOLO
+
+        self.model = YOLO(model_path)
+        self.conf_threshold = conf_threshold
+        self.names = names_list(self.model.names)
+        self.mask = class_mask(self.names, class_filter)
+
+    def predict(self, frames, imgsz=None):
+        # imgsz (a multiple of 32) overrides the model's default input size
+        if imgsz:
+            return self.model(frames, conf=self.conf_threshold, imgsz=imgsz)
+        return self.model(frames, conf=self.conf_threshold)
+
+    def decode(self, raw, frames):
+        return [postprocess(result, self.names, self.conf_threshold, self.mask) for result in raw]
+
+
+class ExportedBackend(abc.ABC):
+    # Runs an exported YOLO (ONNX) graph on CPU: letterbox -> graph -> decode + NMS.
+    # Output layout is Ultralytics' (batch, 4 + classes, anchors) with xywh boxes.
+    # The graph is exported with dynamic axes, so predict() may letterbox to another size.
+    # Runtimes subclass it and implement _run().
+    def __init__(self, onnx_path, names, imgsz=640, conf_threshold=0.5, class_filter=None, iou_threshold=0.7,
+                 max_det=300):
+        self.onnx_path = onnx_path
+        self.names = list(names)
+        self.imgsz = imgsz
+        self.conf_threshold = conf_threshold
+        self.iou_threshold = iou_threshold
+        self.max_det = max_det
+        self.mask = class_mask(self.names, class_filter)
+
+    def predict(self, frames, imgsz=None):
+        # Returns (graph output, letterbox transform per frame) for decode()
+        imgsz = imgsz or self.imgsz
+        batch = np.empty((len(frames), 3, imgsz, imgsz), dtype=np.float32)
+        transforms = []
+        for i, frame in enumerate(frames):
+            batch[i], transform = self._preprocess(frame, imgsz)
+            transforms.append(transform)
+        return self._run(batch), transforms
+
+    def decode(self, raw, frames):
+        outputs, transforms = raw
+        detections = []
+        for output, (ratio, pad_x, pad_y) in zip(outputs, transforms):
+            predictions = output.T
+            scores = predictions[:, 4:]
+            class_ids = scores.argmax(axis=1).astype(np.int32)
+            conf = scores[np.arange(len(scores)), class_ids]
+            keep = conf >= self.conf_threshold
+            boxes, conf, class_ids = predictions[keep, :4], conf[keep], class_ids[keep]
+
+            xyxy = np.empty_like(boxes)
+            xyxy[:, 0] = (boxes[:, 0] - boxes[:, 2] / 2 - pad_x) / ratio
+            xyxy[:, 1] = (boxes[:, 1] - boxes[:, 3] / 2 - pad_y) / ratio
+            xyxy[:, 2] = (boxes[:, 0] + boxes[:, 2] / 2 - pad_x) / ratio
+            xyxy[:, 3] = (boxes[:, 1] + boxes[:, 3] / 2 - pad_y) / ratio
+
+            keep = self._nms(xyxy, conf, class_ids)
+            detections.append(filter_detections(
+                xyxy[keep], conf[keep].astype(np.float32), class_ids[keep], self.names,
+                self.conf_threshold, self.mask,
+            ))
+        return detections
+
+    def _preprocess(self, frame, imgsz):
+        height, width = frame.shape[:2]
+        ratio = min(imgsz / height, imgsz / width)
+        new_w, new_h = int(round(width * ratio)), int(round(height * ratio))
+        pad_x, pad_y = (imgsz - new_w) // 2, (imgsz - new_h) // 2
+
+        canvas = np.full((imgsz, imgsz, 3), 114, dtype=np.uint8)
+        canvas[pad_y:pad_y + new_h, pad_x:pad_x + new_w] = cv2.resize(
+            frame, (new_w, new_h), interpolation=cv2.INTER_LINEAR)
+        tensor = cv2.cvtColor(canvas, cv2.COLOR_BGR2RGB).transpose(2, 0, 1).astype(np.float32) / 255.0
+        return tensor, (ratio, pad_x, pad_y)
+
+    def _nms(self, xyxy, conf, class_ids):
+        # Class-aware NMS: offset boxes per class so different classes never overlap
+        if len(conf) == 0:
+            return np.empty(0, dtype=np.int64)
+        offset = class_ids[:, None].astype(np.float32) * 7680
+        shifted = xyxy + offset
+        boxes = np.column_stack([shifted[:, :2], shifted[:, 2:] - shifted[:, :2]])
+        keep = cv2.dnn.NMSBoxes(boxes.tolist(), conf.tolist(), self.conf_threshold, self.iou_threshold)
+        return np.array(keep, dtype=np.int64).reshape(-1)[:self.max_det]
+
+    @abc.abstractmethod
+    def _run(self, batch):
+        # (batch, 3, imgsz, imgsz) float32 RGB in 0..1 -> raw graph output
+        raise NotImplementedError
+
+
+class OnnxRuntimeBackend(ExportedBackend):
+    def __init__(self, onnx_path, names, **kwargs):
+        super().__init__(onnx_path, names, **kwargs)
+        import onnxruntime
+
+        options = onnxruntime.SessionOptions()
+        options.graph_optimization_level = onnxruntime.GraphOptimizationLevel.ORT_ENABLE_ALL
+        self.session = onnxruntime.InferenceSession(onnx_path, options, providers=["CPUExecutionProvider"])
+        self.input_name = self.session.get_inputs()[0].name
+
+    def _run(self, batch):
+        return self.session.run(None, {self.input_name: batch})[0]
+
+
+class OpenVinoBackend(ExportedBackend):
+    def __init__(self, onnx_path, names, **kwargs):
+        super().__init__(onnx_path, names, **kwargs)
+        import openvino
+
+        self.compiled = openvino.Core().compile_model(onnx_path, "CPU")
+
+    def _run(self, batch):
+        return self.compiled(batch)[self.compiled.output(0)]
+
+
+def weights_hash(model_path):
+    digest = hashlib.sha256()
+    with open(model_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()[:16]
+
+
+def export_model(model_path, imgsz=640, int8=False, cache_dir="model_cache"):
+    # Exports best.pt to ONNX once and caches it by the hash of the weights;
+    # returns (onnx path, class names). PyTorch is only loaded on a cache miss.
+    stem = os.path.splitext(os.path.basename(model_path))[0]
+    base = os.path.join(cache_dir, f"{stem}-{weights_hash(model_path)}-{imgsz}{'-int8' if int8 else ''}")
+    onnx_path, names_path = base + ".onnx", base + ".json"
+    if os.path.exists(onnx_path) and os.path.exists(names_path):
+        with open(names_path, 'r', encoding='utf-8') as f:
+            return onnx_path, json.load(f)
+
+    from ultralytics import YOLO
+
+    os.makedirs(cache_dir, exist_ok=True)
+    model = YOLO(model_path)
+    exported = model.export(format="onnx", imgsz=imgsz, dynamic=True)
+    if int8:
+        from onnxruntime.quantization import QuantType, quantize_dynamic
+
+        quantize_dynamic(exported, onnx_path, weight_type=QuantType.QUInt8)
+        os.remove(exported)
+    else:
+        shutil.move(exported, onnx_path)
+    with open(names_path, 'w', encoding='utf-8') as f:
+        json.dump(names_list(model.names), f)
+    return onnx_path, names_list(model.names)
+
+
+def load_backend(model_path, backend="auto", conf_threshold=0.5, class_filter=None, imgsz=640, int8=False,
+                 cache_dir="model_cache", warmup=True):
+    # "auto" tries ONNX Runtime, then OpenVINO; any failure falls back to Ultralytics
+    loaded = None
+    if backend != "ultralytics":
+        for name in ([backend] if backend != "auto" else ["onnxruntime", "openvino"]):
+            try:
+                # The runtime is checked first: exporting loads PyTorch, which is
+                # wasted work when the runtime is not installed anyway
+                importlib.import_module(name)
+                onnx_path, names = export_model(model_path, imgsz, int8, cache_dir)
+                cls = OnnxRuntimeBackend if name == "onnxruntime" else OpenVinoBackend
+                loaded = cls(onnx_path, names, imgsz=imgsz, conf_threshold=conf_threshold,
+                             class_filter=class_filter)
+                break
+            except Exception as e:
+                print(f"Warning: {name} backend unavailable ({e}).")
+
+    if loaded is None:
+        loaded = UltralyticsBackend(model_path, conf_threshold, class_filter)
+    if warmup:
+        dummy = np.zeros((imgsz, imgsz, 3), dtype=np.uint8)
+        loaded.decode(loaded.predict([dummy]), [dummy])
+    return loaded
+
+
+def compare_backends(reference, candidate, frames, iou_threshold=0.9, conf_tolerance=0.05):
+    # Every box of the reference must have a same-class box in the candidate with
+    # IoU >= iou_threshold and |conf difference| <= conf_tolerance (and vice versa)
+    from tracker import box_iou
+
+    mismatches = 0
+    for expected, actual in zip(reference.decode(reference.predict(frames), frames),
+                                candidate.decode(candidate.predict(frames), frames)):
+        if len(expected.names) != len(actual.names):
+            mismatches += 1
+            continue
+        if not expected.names:
+            continue
+        ious = box_iou(expected.xyxy, actual.xyxy)
+        same_class = expected.class_ids[:, None] == actual.class_ids[None, :]
+        close_conf = np.abs(expected.conf[:, None] - actual.conf[None, :]) <= conf_tolerance
+        matched = (ious >= iou_threshold) & same_class & close_conf
+        if not (matched.any(axis=1).all() and matched.any(axis=0).all()):
+            mismatches += 1
+    return mismatches
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Export best.pt and check the exported backend against Ultralytics")
+    parser.add_argument("model", nargs="?", default="best.pt")
+    parser.add_argument("video", nargs="?", default="DLIP_Test_Video_Simple2.mp4")
+    parser.add_argument("--backend", choices=BACKENDS[2:], default="onnxruntime")
+    parser.add_argument("--int8", action="store_true")
+    parser.add_argument("--frames", type=int, default=50)
+    args = parser.parse_args()
+
+    cap = cv2.VideoCapture(args.video)
+    frames = []
+    while len(frames) < args.frames:
+        ret, frame = cap.read()
+        if not ret:
+            break
+        frames.append(frame)
+    cap.release()
+
+    reference = load_backend(args.model, "ultralytics")
+    candidate = load_backend(args.model, args.backend, int8=args.int8)
+    mismatches = sum(compare_backends(reference, candidate, [frame]) for frame in frames)
+    print(f"{type(candidate).__name__}: {mismatches} of {len(frames)} frames differ beyond tolerance")
@@ -0,0 +1,126 @@
+import base64
+import json
+import os
+import socket
+import struct
+import threading
+from urllib.parse import urlsplit
+
+from PyQt5.QtCore import QThread, pyqtSignal
+
+# Largest frame accepted from the service (a snapshot of a full fridge is a few KiB)
+MAX_FRAME_BYTES = 16 * 1024 * 1024
+
+
+class InventoryClient(QThread):
+    # Follows a headless_fridge.py service over its /ws WebSocket, so the Qt window
+    # can run as a client instead of opening the cameras itself. Emits the item
+    # records (fridge_state.item_record) of the snapshot sent on connect and of
+    # every diff after it; reconnects every retry_seconds while the service is away.
+    items_received = pyqtSignal(bool, object)  # (is snapshot, [item record, ...])
+    connection_changed = pyqtSignal(bool)
+
+    def __init__(self, url, retry_seconds=2.0, parent=None):
+        super().__init__(parent)
+        parts = urlsplit(url if "//" in url else f"ws://{url}")
+        self.host = parts.hostname or "127.0.0.1"
+        self.port = parts.port or 8080
+        self.retry_seconds = retry_seconds
+        self._stop_event = threading.Event()
+        self._socket = None
+
+    def run(self):
+        while not self._stop_event.is_set():
+            connected = False
+            try:
+                self._socket = socket.create_connection((self.host, self.port), timeout=self.retry_seconds)
+                self._socket.settimeout(None)
+                self._handshake()
+                connected = True
+                self.connection_changed.emit(True)
+                self._follow()
+            except (OSError, ValueError) as e:
+                if not self._stop_event.is_set():
+                    print(f"Warning: Inventory service at {self.host}:{self.port} unavailable ({e}).")
+            finally:
+                if self._socket is not None:
+                    self._socket.close()
+                    self._socket = None
+                if connected:
+                    self.connection_changed.emit(False)
+            self._stop_event.wait(self.retry_seconds)
+
+    def stop(self):
+        self._stop_event.set()
+        sock = self._socket
+        if sock is not None:
+            # Unblocks the recv() of the client thread
+            try:
+                sock.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+        self.wait()
+
+    def _handshake(self):
+        key = base64.b64encode(os.urandom(16)).decode()
+        self._socket.sendall(
+            f"GET /ws HTTP/1.1\r\nHost: {self.host}:{self.port}\r\nUpgrade: websocket\r\n"
+            f"Connection: Upgrade\r\nSec-WebSocket-Key: {key}\r\nSec-WebSocket-Version: 13\r\n\r\n"
+            .encode('latin-1')
+        )
+        response = b""
+        while b"\r\n\r\n" not in response:
+            chunk = self._socket.recv(4096)
+            if not chunk or len(response) > 65536:
+                raise ValueError("no WebSocket handshake")
+            response += chunk
+        status = response.split(b"\r\n", 1)[0].split()
+        if len(status) < 2 or status[1] != b"101":
+            raise ValueError(f"unexpected response {b' '.join(status[1:]).decode('latin-1')}")
+        # Bytes after the headers already belong to the first frame
+        self._buffer = bytearray(response.split(b"\r\n\r\n", 1)[1])
+
+    def _follow(self):
+        while not self._stop_event.is_set():
+            opcode, payload = self._read_frame()
+            if opcode == 0x1:
+                message = json.loads(payload.decode('utf-8'))
+                self.items_received.emit(message.get("type") == "snapshot", message.get("items", []))
+            elif opcode == 0x8:
+                return
+            elif opcode == 0x9:
+                self._send(0xA, payload)
+
+    def _read_frame(self):
+        first, second = self._read(2)
+        length = second & 0x7F
+        if length == 126:
+            length, = struct.unpack("!H", self._read(2))
+        elif length == 127:
+            length, = struct.unpack("!Q", self._read(8))
+        if length > MAX_FRAME_BYTES:
+            raise ValueError(f"frame of {length} bytes")
+        if not second & 0x80:
+            return first & 0x0F, self._read(length)
+        # The service does not mask its frames; handled for completeness
+        mask = self._read(4)
+        payload = bytearray(self._read(length))
+        for i in range(length):
+            payload[i] ^= mask[i % 4]
+        return first & 0x0F, bytes(payload)
+
+    def _read(self, count):
+        while len(self._buffer) < count:
+            chunk = self._socket.recv(65536)
+            if not chunk:
+                raise ConnectionError("connection closed")
+            self._buffer += chunk
+        data = bytes(self._buffer[:count])
+        del self._buffer[:count]
+        return data
+
+    def _send(self, opcode, payload):
+        # Client -> server frames must be masked
+        mask = os.urandom(4)
+        masked = bytes(byte ^ mask[i % 4] for i, byte in enumerate(payload))
+        self._socket.sendall(struct.pack("!BB", 0x80 | opcode, 0x80 | len(payload)) + mask + masked)
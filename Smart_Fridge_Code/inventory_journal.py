@@ -0,0 +1,104 @@
+import queue
+import sqlite3
+import threading
+from datetime import datetime
+
+
+class InventoryJournal:
+    # Append-only log of inventory changes in SQLite (WAL mode) so registration
+    # times survive a restart. record() only enqueues; a writer thread commits
+    # the queue in batches every flush_interval seconds and every
+    # snapshot_every events folds the log into a snapshot table.
+    def __init__(self, path="inventory.db", flush_interval=1.0, snapshot_every=1000):
+        self.path = path
+        self.flush_interval = flush_interval
+        self.snapshot_every = snapshot_every
+        self._queue = queue.SimpleQueue()
+        self._stop_event = threading.Event()
+
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.executescript("""
+            CREATE TABLE IF NOT EXISTS events (
+                id INTEGER PRIMARY KEY, food TEXT NOT NULL, registered_at REAL, at REAL NOT NULL);
+            CREATE TABLE IF NOT EXISTS snapshot (food TEXT PRIMARY KEY, registered_at REAL NOT NULL);
+            CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value INTEGER NOT NULL);
+        """)
+        self._db.commit()
+
+        self._state = self._load_state()
+        self._events_since_snapshot = 0
+        self._writer = threading.Thread(target=self._write_loop, daemon=True)
+        self._writer.start()
+
+    def restore(self):
+        # {food: registration datetime} as of the last run
+        return {food: datetime.fromtimestamp(ts) for food, ts in self._state.items()}
+
+    def record(self, food, registered_at, current_time):
+        # registered_at is None when the food left the fridge
+        self._queue.put((
+            food,
+            registered_at.timestamp() if registered_at is not None else None,
+            current_time.timestamp(),
+        ))
+
+    def close(self):
+        self._stop_event.set()
+        self._writer.join()
+        self._db.close()
+
+    def _load_state(self):
+        # Snapshot plus the tail of the log written after it
+        state = dict(self._db.execute("SELECT food, registered_at FROM snapshot"))
+        row = self._db.execute("SELECT value FROM meta WHERE key = 'snapshot_event_id'").fetchone()
+        last_id = row[0] if row else 0
+        for food, registered_at in self._db.execute(
+                "SELECT food, registered_at FROM events WHERE id > ? ORDER BY id", (last_id,)):
+            if registered_at is None:
+                state.pop(food, None)
+            else:
+                state[food] = registered_at
+        return state
+
+    def _write_loop(self):
+        while True:
+            stopping = self._stop_event.wait(self.flush_interval)
+            self._flush()
+            if stopping:
+                if self._events_since_snapshot:
+                    self._snapshot()
+                break
+
+    def _flush(self):
+        batch = []
+        while True:
+            try:
+                batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        if not batch:
+            return
+
+        with self._db:
+            self._db.executemany("INSERT INTO events (food, registered_at, at) VALUES (?, ?, ?)", batch)
+        for food, registered_at, _ in batch:
+            if registered_at is None:
+                self._state.pop(food, None)
+            else:
+                self._state[food] = registered_at
+
+        self._events_since_snapshot += len(batch)
+        if self._events_since_snapshot >= self.snapshot_every:
+            self._snapshot()
+
+    def _snapshot(self):
+        with self._db:
+            last_id = self._db.execute("SELECT COALESCE(MAX(id), 0) FROM events").fetchone()[0]
+            self._db.execute("DELETE FROM snapshot")
+            self._db.executemany("INSERT INTO snapshot (food, registered_at) VALUES (?, ?)", self._state.items())
+            self._db.execute(
+                "INSERT OR REPLACE INTO meta (key, value) VALUES ('snapshot_event_id', ?)", (last_id,))
+            self._db.execute("DELETE FROM events WHERE id <= ?", (last_id,))
+        self._events_since_snapshot = 0
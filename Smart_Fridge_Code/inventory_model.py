@@ -0,0 +1,137 @@
+from datetime import datetime
+
+from PyQt5.QtCore import QAbstractTableModel, QModelIndex, Qt
+from PyQt5.QtGui import QColor
+
+HEADERS = [" ", "Name", "Registered Time", "Elapsed Time"]
+ELAPSED_COLUMN = 3
+# Items older than this (seconds) are shown in red
+ALERT_SECONDS = 10
+
+ALERT_COLOR = QColor(255, 0, 0)
+NORMAL_COLOR = QColor(0, 0, 0)
+
+
+class InventoryRecord:
+    __slots__ = ("name", "emote", "registered_str", "registered_at", "count", "zones")
+
+    def __init__(self, name, emote, registered_at, count=1, zones=()):
+        self.name = name
+        self.emote = emote
+        self.count = count
+        self.zones = tuple(zones)
+        self.registered_at = registered_at
+        self.registered_str = registered_at.strftime("%Y-%m-%d %H:%M:%S")
+
+
+class InventoryModel(QAbstractTableModel):
+    # Foods currently in the fridge, one row per food with an O(1) name -> row index.
+    # Rows change only when a food appears / disappears; the elapsed-time column is
+    # refreshed separately by refresh_elapsed().
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._records = []
+        self._row_index = {}
+        self._now = datetime.now()
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._records)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(HEADERS)
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal:
+            return HEADERS[section]
+        return None
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        record = self._records[index.row()]
+        column = index.column()
+
+        if role == Qt.DisplayRole:
+            if column == 0:
+                return record.emote
+            if column == 1:
+                name = record.name if record.count <= 1 else f"{record.name} x{record.count}"
+                return f"{name} ({', '.join(record.zones)})" if record.zones else name
+            if column == 2:
+                return record.registered_str
+            return self._elapsed_str(record)
+        if role == Qt.TextAlignmentRole:
+            return Qt.AlignCenter
+        if role == Qt.ForegroundRole:
+            if self._elapsed_seconds(record) >= ALERT_SECONDS:
+                return ALERT_COLOR
+            return NORMAL_COLOR
+        return None
+
+    def present_foods(self):
+        return [record.name for record in self._records]
+
+    def elapsed_seconds(self):
+        # {food: seconds in the fridge} as of the last refresh
+        return {record.name: self._elapsed_seconds(record) for record in self._records}
+
+    def add(self, name, emote, registered_at):
+        if name in self._row_index:
+            self.set_registered_at(name, registered_at)
+            return
+        row = len(self._records)
+        self.beginInsertRows(QModelIndex(), row, row)
+        self._records.append(InventoryRecord(name, emote, registered_at))
+        self._row_index[name] = row
+        self.endInsertRows()
+
+    def remove(self, name):
+        row = self._row_index.pop(name, None)
+        if row is None:
+            return
+        self.beginRemoveRows(QModelIndex(), row, row)
+        del self._records[row]
+        for record in self._records[row:]:
+            self._row_index[record.name] -= 1
+        self.endRemoveRows()
+
+    def set_registered_at(self, name, registered_at):
+        row = self._row_index.get(name)
+        if row is None or self._records[row].registered_at == registered_at:
+            return
+        record = self._records[row]
+        self._records[row] = InventoryRecord(record.name, record.emote, registered_at, record.count, record.zones)
+        self.dataChanged.emit(self.index(row, 0), self.index(row, len(HEADERS) - 1))
+
+    def set_count(self, name, count):
+        # Number of tracked instances of a food, shown next to its name
+        row = self._row_index.get(name)
+        if row is None or self._records[row].count == count:
+            return
+        self._records[row].count = count
+        self.dataChanged.emit(self.index(row, 1), self.index(row, 1), [Qt.DisplayRole])
+
+    def set_zones(self, name, zones):
+        # Shelf zones a food is currently seen in, shown next to its name
+        row = self._row_index.get(name)
+        if row is None or self._records[row].zones == tuple(zones):
+            return
+        self._records[row].zones = tuple(zones)
+        self.dataChanged.emit(self.index(row, 1), self.index(row, 1), [Qt.DisplayRole])
+
+    def refresh_elapsed(self, now=None):
+        # Only the elapsed time and the alert colour depend on the clock
+        self._now = now or datetime.now()
+        if self._records:
+            self.dataChanged.emit(
+                self.index(0, 0), self.index(len(self._records) - 1, ELAPSED_COLUMN),
+                [Qt.DisplayRole, Qt.ForegroundRole],
+            )
+
+    def _elapsed_seconds(self, record):
+        return max(0.0, (self._now - record.registered_at).total_seconds())
+
+    def _elapsed_str(self, record):
+        if self._now <= record.registered_at:
+            return "0:00:00"
+        return str(self._now - record.registered_at).split('.')[0]
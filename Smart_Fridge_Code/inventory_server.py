@@ -0,0 +1,250 @@
+import asyncio
+import base64
+import hashlib
+import json
+import struct
+from datetime import datetime
+from functools import partial
+from urllib.parse import parse_qs, urlsplit
+
+from fridge_state import item_record
+
+WEBSOCKET_GUID = "258EAFA5-E914-47DA-95CA-C5AB0DC85B11"
+# Largest frame accepted from a client (dashboards only send control frames)
+MAX_FRAME_BYTES = 64 * 1024
+# A client whose unsent diffs pass this many bytes has stalled and is dropped
+MAX_CLIENT_BUFFER = 1024 * 1024
+
+
+class InventoryServer:
+    # Small asyncio HTTP / WebSocket server over a FridgeInventory:
+    #   GET /inventory             current items with registration and elapsed time
+    #   GET /recipes?max_missing=2 RecipeRecommender results for the current items
+    #   GET /recipes?top=10        the 10 best ranked recipes (RecipeRecommender.top_k)
+    #   GET /shopping?budget=2     the item sets to buy that unlock the most recipes
+    #   GET /ws                    WebSocket: a snapshot on connect, then inventory diffs
+    #   GET /metrics               pipeline metrics as Prometheus text (/metrics.json as JSON)
+    # All inventory access happens on the event loop thread; the detection
+    # thread hands frames over with submit(). Recipe queries get a copy of the
+    # inventory state and run on the default executor, so a slow query does not
+    # hold up the other requests or the WebSocket diffs.
+    # There is no authentication, so it listens on loopback by default and only
+    # sends a CORS header for the one origin given in allow_origin.
+    def __init__(self, inventory, recommender, host="127.0.0.1", port=8080, metrics=None, allow_origin=None):
+        self.inventory = inventory
+        self.recommender = recommender
+        self.metrics = metrics
+        self.allow_origin = allow_origin
+        self.host = host
+        self.port = port
+        self.loop = None
+        self._clients = set()
+        self._server = None
+
+    async def start(self):
+        self.loop = asyncio.get_running_loop()
+        self._server = await asyncio.start_server(self._handle, self.host, self.port)
+        print(f"Serving inventory on http://{self.host}:{self.port}")
+
+    async def serve_forever(self):
+        if self._server is None:
+            await self.start()
+        async with self._server:
+            await self._server.serve_forever()
+
+    def submit(self, source_id, class_names, current_time, zone_names=None):
+        # Thread-safe entry point for the detection pipeline
+        self.loop.call_soon_threadsafe(
+            self._apply, source_id, list(class_names), current_time,
+            list(zone_names) if zone_names is not None else None,
+        )
+
+    def _apply(self, source_id, class_names, current_time, zone_names=None):
+        changes = self.inventory.update(source_id, class_names, current_time, zone_names)
+        if changes and self._clients:
+            message = json.dumps({
+                "type": "diff",
+                "items": [item_record(food, start_time, current_time, self.inventory.zones_of(food))
+                          for food, start_time in changes],
+            })
+            for writer in list(self._clients):
+                self._send_text(writer, message)
+
+    def _snapshot(self):
+        return {"type": "snapshot", "items": self.inventory.snapshot(datetime.now())}
+
+    async def _handle(self, reader, writer):
+        try:
+            request_line = (await reader.readline()).decode('latin-1').split()
+            headers = {}
+            while True:
+                line = (await reader.readline()).decode('latin-1').strip()
+                if not line:
+                    break
+                name, _, value = line.partition(":")
+                headers[name.strip().lower()] = value.strip()
+
+            if len(request_line) < 2 or request_line[0] != "GET":
+                await self._respond(writer, 405, {"error": "method not allowed"})
+                return
+
+            try:
+                try:
+                    url = urlsplit(request_line[1])
+                except ValueError:
+                    raise BadRequest("invalid request target") from None
+                await self._route(reader, writer, url, headers)
+            except BadRequest as e:
+                await self._respond(writer, 400, {"error": str(e)})
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            self._clients.discard(writer)
+            writer.close()
+
+    async def _route(self, reader, writer, url, headers):
+        if url.path == "/ws" and headers.get("upgrade", "").lower() == "websocket":
+            if "sec-websocket-key" not in headers:
+                raise BadRequest("missing Sec-WebSocket-Key")
+            await self._websocket(reader, writer, headers)
+        elif url.path == "/inventory":
+            await self._respond(writer, 200, self._snapshot())
+        elif url.path == "/recipes":
+            query = parse_qs(url.query)
+            max_missing = _int_param(query, "max_missing", 2)
+            available = self.inventory.present_foods()
+            if "top" in query:
+                ranked = await self.loop.run_in_executor(None, partial(
+                    self.recommender.top_k, available, _int_param(query, "top", 10), max_missing,
+                    elapsed_seconds=self.inventory.elapsed_seconds(datetime.now()),
+                ))
+                payload = {"ranked": ranked}
+            else:
+                payload = await self.loop.run_in_executor(
+                    None, self.recommender.recommend, available, max_missing,
+                )
+            await self._respond(writer, 200, payload)
+        elif url.path == "/shopping":
+            query = parse_qs(url.query)
+            budget, results = _int_param(query, "budget", 2), _int_param(query, "results", 5)
+            suggestions = await self.loop.run_in_executor(
+                None, self.recommender.shopping_list, self.inventory.present_foods(), budget, results,
+            )
+            await self._respond(writer, 200, {"suggestions": suggestions})
+        elif url.path == "/metrics.json" and self.metrics is not None:
+            await self._respond(writer, 200, self.metrics.snapshot())
+        elif url.path == "/metrics" and self.metrics is not None:
+            await self._respond(writer, 200, self.metrics.to_prometheus(), "text/plain; version=0.0.4")
+        else:
+            await self._respond(writer, 404, {"error": "not found"})
+
+    async def _respond(self, writer, status, payload, content_type="application/json"):
+        if content_type == "application/json":
+            payload = json.dumps(payload)
+        body = payload.encode('utf-8')
+        reason = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed"}[status]
+        cors = f"Access-Control-Allow-Origin: {self.allow_origin}\r\n" if self.allow_origin else ""
+        writer.write(
+            f"HTTP/1.1 {status} {reason}\r\n"
+            f"Content-Type: {content_type}\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            f"{cors}"
+            f"Connection: close\r\n\r\n".encode('latin-1') + body
+        )
+        await writer.drain()
+
+    async def _websocket(self, reader, writer, headers):
+        accept = base64.b64encode(
+            hashlib.sha1((headers["sec-websocket-key"] + WEBSOCKET_GUID).encode()).digest()
+        ).decode()
+        writer.write(
+            "HTTP/1.1 101 Switching Protocols\r\n"
+            "Upgrade: websocket\r\n"
+            "Connection: Upgrade\r\n"
+            f"Sec-WebSocket-Accept: {accept}\r\n\r\n".encode('latin-1')
+        )
+        self._send_text(writer, json.dumps(self._snapshot()))
+        self._clients.add(writer)
+
+        # Only control frames are expected from dashboards
+        while True:
+            try:
+                opcode, payload = await _read_frame(reader)
+            except FrameTooLarge:
+                # 1009: message too big
+                writer.write(_frame(0x8, struct.pack("!H", 1009)))
+                await writer.drain()
+                return
+            if opcode == 0x8:
+                writer.write(_frame(0x8, payload[:2]))
+                await writer.drain()
+                return
+            if opcode == 0x9:
+                writer.write(_frame(0xA, payload))
+            await writer.drain()
+
+    def _send_text(self, writer, message):
+        # Diffs are pushed without awaiting drain(); a dashboard that stops reading
+        # is cut off once its transport buffer passes MAX_CLIENT_BUFFER
+        if writer.is_closing():
+            self._clients.discard(writer)
+            return
+        if writer.transport.get_write_buffer_size() > MAX_CLIENT_BUFFER:
+            print("Warning: Dropping a WebSocket client that stopped reading.")
+            self._clients.discard(writer)
+            writer.transport.abort()
+            return
+        writer.write(_frame(0x1, message.encode('utf-8')))
+
+
+class BadRequest(Exception):
+    # Answered with 400 and the message
+    pass
+
+
+class FrameTooLarge(Exception):
+    # Client frame over the RFC 6455 control frame limit or MAX_FRAME_BYTES
+    pass
+
+
+def _int_param(query, name, default):
+    # Non-negative integer query parameter
+    values = query.get(name)
+    if not values:
+        return default
+    try:
+        value = int(values[0])
+    except ValueError:
+        raise BadRequest(f"'{name}' must be an integer") from None
+    if value < 0:
+        raise BadRequest(f"'{name}' must not be negative")
+    return value
+
+
+def _frame(opcode, payload):
+    # Unmasked server -> client frame
+    length = len(payload)
+    if length < 126:
+        header = struct.pack("!BB", 0x80 | opcode, length)
+    elif length < 1 << 16:
+        header = struct.pack("!BBH", 0x80 | opcode, 126, length)
+    else:
+        header = struct.pack("!BBQ", 0x80 | opcode, 127, length)
+    return header + payload
+
+
+async def _read_frame(reader, max_length=MAX_FRAME_BYTES):
+    # The length is checked before the payload is read, so nothing is buffered for oversized frames
+    first, second = await reader.readexactly(2)
+    length = second & 0x7F
+    if length == 126:
+        length, = struct.unpack("!H", await reader.readexactly(2))
+    elif length == 127:
+        length, = struct.unpack("!Q", await reader.readexactly(8))
+    if length > (125 if first & 0x08 else max_length):
+        raise FrameTooLarge(length)
+    mask = await reader.readexactly(4) if second & 0x80 else b"\0\0\0\0"
+    payload = bytearray(await reader.readexactly(length))
+    for i in range(length):
+        payload[i] ^= mask[i % 4]
+    return first & 0x0F, bytes(payload)
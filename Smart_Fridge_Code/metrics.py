@@ -0,0 +1,105 @@
+import json
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+import cv2
+
+
+class PipelineMetrics:
+    # Low-overhead per-stage timing: each sample is two perf_counter() calls and
+    # a deque append; percentiles are only computed when a snapshot is taken.
+    # Keeps the last `window` samples per stage, frame timestamps for FPS and
+    # plain counters (dropped / skipped frames).
+    def __init__(self, window=1024):
+        self.window = window
+        self._stages = {}
+        self._frames = deque(maxlen=window)
+        self._counters = {}
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def stage(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - start)
+
+    def record(self, name, seconds):
+        samples = self._stages.get(name)
+        if samples is None:
+            with self._lock:
+                samples = self._stages.setdefault(name, deque(maxlen=self.window))
+        samples.append(seconds)
+
+    def frame_done(self):
+        self._frames.append(time.perf_counter())
+
+    def set_counter(self, name, value):
+        self._counters[name] = value
+
+    def increment(self, name, amount=1):
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + amount
+
+    def fps(self):
+        frames = list(self._frames)
+        if len(frames) < 2 or frames[-1] == frames[0]:
+            return 0.0
+        return (len(frames) - 1) / (frames[-1] - frames[0])
+
+    def snapshot(self):
+        with self._lock:
+            stages = list(self._stages.items())
+        result = {"fps": self.fps(), "counters": dict(self._counters), "stages": {}}
+        for name, samples in stages:
+            values = sorted(samples)
+            if not values:
+                continue
+            result["stages"][name] = {
+                "count": len(values),
+                "mean_ms": 1000 * sum(values) / len(values),
+                "p50_ms": 1000 * _percentile(values, 50),
+                "p95_ms": 1000 * _percentile(values, 95),
+                "p99_ms": 1000 * _percentile(values, 99),
+            }
+        return result
+
+    def to_json(self):
+        return json.dumps(self.snapshot())
+
+    def to_prometheus(self, prefix="smart_fridge"):
+        snapshot = self.snapshot()
+        lines = [
+            f"# TYPE {prefix}_fps gauge",
+            f"{prefix}_fps {snapshot['fps']:.3f}",
+        ]
+        for name, value in snapshot["counters"].items():
+            lines.append(f"# TYPE {prefix}_{name} gauge")
+            lines.append(f"{prefix}_{name} {value}")
+        if snapshot["stages"]:
+            lines.append(f"# TYPE {prefix}_stage_seconds summary")
+        for name, stats in snapshot["stages"].items():
+            for quantile in (50, 95, 99):
+                lines.append(
+                    f'{prefix}_stage_seconds{{stage="{name}",quantile="{quantile / 100:g}"}} '
+                    f"{stats[f'p{quantile}_ms'] / 1000:.6f}"
+                )
+            lines.append(f'{prefix}_stage_seconds_count{{stage="{name}"}} {stats["count"]}')
+        return "\n".join(lines) + "\n"
+
+    def draw_overlay(self, frame):
+        snapshot = self.snapshot()
+        lines = [f"FPS {snapshot['fps']:.1f}"]
+        lines += [f"{name}: p50 {stats['p50_ms']:.1f} / p95 {stats['p95_ms']:.1f} ms"
+                  for name, stats in snapshot["stages"].items()]
+        lines += [f"{name}: {value}" for name, value in snapshot["counters"].items()]
+        for i, text in enumerate(lines):
+            cv2.putText(frame, text, (10, 25 + 22 * i), cv2.FONT_HERSHEY_SIMPLEX, 0.6, (0, 255, 255), 2)
+
+
+def _percentile(sorted_values, percent):
+    index = min(len(sorted_values) - 1, int(round(percent / 100 * (len(sorted_values) - 1))))
+    return sorted_values[index]
@@ -0,0 +1,43 @@
+import threading
+import time
+
+import cv2
+import numpy as np
+
+
+class MotionGate:
+    # Decides per frame whether YOLO needs to run: only when a downscaled
+    # grayscale diff against the last detected frame exceeds diff_threshold,
+    # when trigger() was called (e.g. a door-open sensor), or when
+    # min_interval seconds have passed since the last detection.
+    def __init__(self, diff_threshold=8.0, min_interval=5.0, size=(64, 48)):
+        self.diff_threshold = diff_threshold
+        self.min_interval = min_interval
+        self.size = size
+        self._reference = None
+        self._last_run = 0.0
+        self._triggered = threading.Event()
+        self.frames = 0
+        self.skipped = 0
+
+    def trigger(self):
+        self._triggered.set()
+
+    def should_detect(self, frame, now=None):
+        now = time.monotonic() if now is None else now
+        small = cv2.cvtColor(cv2.resize(frame, self.size, interpolation=cv2.INTER_AREA), cv2.COLOR_BGR2GRAY)
+        self.frames += 1
+
+        run = (
+            self._reference is None
+            or self._triggered.is_set()
+            or now - self._last_run >= self.min_interval
+            or float(np.mean(cv2.absdiff(small, self._reference))) > self.diff_threshold
+        )
+        if run:
+            self._triggered.clear()
+            self._reference = small
+            self._last_run = now
+        else:
+            self.skipped += 1
+        return run
@@ -0,0 +1,68 @@
+from collections import namedtuple
+
+import cv2
+import numpy as np
+
+# Detections of one frame as parallel arrays:
+# xyxy (N, 4) int32, conf (N,) float32, class_ids (N,) int32, names: list of N class names,
+# zones: list of N shelf-zone names (None when no shelf zones are configured)
+Detections = namedtuple("Detections", ["xyxy", "conf", "class_ids", "names", "zones"], defaults=(None,))
+
+
+def empty_detections():
+    return Detections(
+        np.empty((0, 4), dtype=np.int32),
+        np.empty(0, dtype=np.float32),
+        np.empty(0, dtype=np.int32),
+        [],
+    )
+
+
+def names_list(class_names):
+    # YOLO exposes names as {id: name}; post-processing indexes a plain list
+    if isinstance(class_names, dict):
+        return [class_names[i] for i in range(len(class_names))]
+    return list(class_names)
+
+
+def class_mask(class_names, allowed_names=None):
+    # Boolean lookup table indexed by class id; None keeps every class
+    if allowed_names is None:
+        return np.ones(len(class_names), dtype=bool)
+    allowed_names = set(allowed_names)
+    return np.array([name in allowed_names for name in class_names], dtype=bool)
+
+
+def postprocess(result, class_names, conf_threshold=0.5, mask=None):
+    # One device -> host copy per tensor per frame, then threshold and class filter as array masks
+    boxes = result.boxes
+    if len(boxes) == 0:
+        return empty_detections()
+
+    conf = boxes.conf.cpu().numpy().astype(np.float32, copy=False)
+    class_ids = boxes.cls.cpu().numpy().astype(np.int32)
+    xyxy = boxes.xyxy.cpu().numpy()
+    return filter_detections(xyxy, conf, class_ids, class_names, conf_threshold, mask)
+
+
+def filter_detections(xyxy, conf, class_ids, class_names, conf_threshold=0.5, mask=None):
+    keep = conf >= conf_threshold
+    if mask is not None:
+        keep &= mask[class_ids]
+
+    class_ids = class_ids[keep]
+    return Detections(
+        xyxy[keep].astype(np.int32),
+        conf[keep],
+        class_ids,
+        [class_names[cls_id] for cls_id in class_ids.tolist()],
+    )
+
+
+def draw_detections(frame, detections):
+    for (x1, y1, x2, y2), conf, cls_name in zip(detections.xyxy.tolist(), detections.conf.tolist(), detections.names):
+        cv2.rectangle(frame, (x1, y1), (x2, y2), (0, 255, 0), 2)
+        label = f"{cls_name} {conf:.2f}"
+        cv2.putText(frame, label, (x1, y1 - 10),
+                    cv2.FONT_HERSHEY_SIMPLEX, 0.6, (0, 255, 0), 2)
+
@@ -0,0 +1,188 @@
+from PyQt5.QtCore import QAbstractListModel, QAbstractTableModel, QModelIndex, Qt
+from PyQt5.QtGui import QColor
+
+from fridge_state import FOOD_EMOTES
+
+TABLE_HEADERS = ["", "Recipe Name", "Owned Ingredients", "Needed Ingredients"]
+RANK_COLUMN = 0
+NAME_COLUMN = 1
+MISSING_COLUMN = 3
+
+# Text color by number of missing ingredients
+MISSING_COLORS = {1: QColor(0, 120, 0), 2: QColor(180, 80, 0)}
+DEFAULT_COLOR = QColor(0, 0, 0)
+
+
+class RecipeRows:
+    # Recipe dicts plus the list of visible positions (after filtering and sorting).
+    # Nothing is formatted up front: views only ask for the rows on screen, and the
+    # lower-cased search text of a recipe is built the first time a filter needs it.
+    def __init__(self):
+        self.recipes = []
+        self.visible = []
+        self.filter_text = ""
+        self._search_text = []
+        self._sort_key = None
+        self._sort_reverse = False
+
+    def set_recipes(self, recipes):
+        self.recipes = list(recipes)
+        self._search_text = [None] * len(self.recipes)
+        self.visible = self._matching(range(len(self.recipes)), self.filter_text)
+        self._sort()
+
+    def set_filter(self, text):
+        # Narrowing the filter (typing more characters) only rescans the visible rows
+        text = text.strip().lower()
+        if text == self.filter_text:
+            return False
+        narrowing = self.filter_text in text
+        self.visible = self._matching(self.visible if narrowing else range(len(self.recipes)), text)
+        self.filter_text = text
+        if not narrowing:
+            self._sort()
+        return True
+
+    def sort(self, key, reverse=False):
+        self._sort_key = key
+        self._sort_reverse = reverse
+        self._sort()
+
+    def recipe(self, row):
+        return self.recipes[self.visible[row]]
+
+    def _sort(self):
+        # Without a key rows keep the order they were given in (the recommender's ranking)
+        if self._sort_key is None:
+            self.visible.sort(reverse=self._sort_reverse)
+        else:
+            recipes = self.recipes
+            self.visible.sort(key=lambda i: self._sort_key(recipes[i]), reverse=self._sort_reverse)
+
+    def _matching(self, candidates, text):
+        if not text:
+            return list(candidates)
+        return [i for i in candidates if text in self._searchable(i)]
+
+    def _searchable(self, i):
+        search_text = self._search_text[i]
+        if search_text is None:
+            recipe = self.recipes[i]
+            search_text = " ".join(
+                [recipe.get('name') or ''] + recipe.get('required_ingredients', [])
+                + recipe.get('optional_ingredients', [])
+            ).lower()
+            self._search_text[i] = search_text
+        return search_text
+
+
+def with_emoji(ingredient):
+    return f"{FOOD_EMOTES.get(ingredient, '')} {ingredient}"
+
+
+class RecipeListModel(QAbstractListModel):
+    # Recipes you can make now, one line per recipe; Qt.UserRole is the recipe dict
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.rows = RecipeRows()
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.rows.visible)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        recipe = self.rows.recipe(index.row())
+        if role == Qt.DisplayRole:
+            ingredients_text = f"Required: {', '.join(recipe.get('required_ingredients', []))}"
+            if recipe.get('optional_ingredients'):
+                ingredients_text += f" | Optional: {', '.join(recipe['optional_ingredients'])}"
+            return f"• {recipe.get('name') or 'Unnamed'} ({ingredients_text})"
+        if role == Qt.UserRole:
+            return recipe
+        return None
+
+    def set_recipes(self, recipes):
+        self.beginResetModel()
+        self.rows.set_recipes(recipes)
+        self.endResetModel()
+
+    def set_filter(self, text):
+        self.beginResetModel()
+        self.rows.set_filter(text)
+        self.endResetModel()
+
+
+class RecipeTableModel(QAbstractTableModel):
+    # Recipes that need extra purchases: emoji, name, owned and needed ingredients.
+    # Rows start in the order given (ranked); sortable by name or missing count,
+    # and the first column goes back to the ranking.
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.rows = RecipeRows()
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.rows.visible)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(TABLE_HEADERS)
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal:
+            return TABLE_HEADERS[section]
+        return None
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        recipe = self.rows.recipe(index.row())
+        column = index.column()
+
+        if role == Qt.DisplayRole:
+            return self._cell_text(recipe, column)
+        if role == Qt.TextAlignmentRole:
+            return Qt.AlignCenter if column == 0 else Qt.AlignLeft | Qt.AlignVCenter
+        if role == Qt.ForegroundRole:
+            return MISSING_COLORS.get(recipe.get('missing_count'), DEFAULT_COLOR)
+        if role == Qt.UserRole:
+            return recipe
+        return None
+
+    def _cell_text(self, recipe, column):
+        required = recipe.get('required_ingredients', [])
+        missing = recipe.get('missing_ingredients', [])
+        if column == 0:
+            return FOOD_EMOTES.get(required[0], '') if required else ''
+        if column == 1:
+            return recipe.get('name') or 'Unnamed'
+        if column == 2:
+            # Owned required ingredients, then the optional ones
+            missing_set = set(missing)
+            owned = [with_emoji(ing) for ing in sorted(ing for ing in required if ing not in missing_set)]
+            owned += [f"{with_emoji(ing)} (Optional)" for ing in recipe.get('optional_ingredients', [])]
+            return ", ".join(owned) if owned else "None"
+        return ", ".join(with_emoji(ing) for ing in missing) if missing else "None"
+
+    def sort(self, column, order=Qt.AscendingOrder):
+        if column not in (RANK_COLUMN, NAME_COLUMN, MISSING_COLUMN):
+            return
+        self.layoutAboutToBeChanged.emit()
+        self.rows.sort(self._sort_key(column), reverse=order == Qt.DescendingOrder)
+        self.layoutChanged.emit()
+
+    def _sort_key(self, column):
+        if column == RANK_COLUMN:
+            return None
+        if column == NAME_COLUMN:
+            return lambda recipe: (recipe.get('name') or '').lower()
+        return lambda recipe: (recipe.get('missing_count', 0), (recipe.get('name') or '').lower())
+
+    def set_recipes(self, recipes):
+        self.beginResetModel()
+        self.rows.set_recipes(recipes)
+        self.endResetModel()
+
+    def set_filter(self, text):
+        self.beginResetModel()
+        self.rows.set_filter(text)
+        self.endResetModel()
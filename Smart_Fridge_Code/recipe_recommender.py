@@ -1,80 +1,512 @@
+import heapq
 import json
+import os
+import threading
+from collections import OrderedDict
+
+from recipe_store import RecipeStore, open_store
+
+# Urgency is quantized to 1/URGENCY_STEPS so top_k results stay cacheable while items age
+URGENCY_STEPS = 20
+
+class RecipeCatalog:
+    # Immutable index over one version of the recipe file:
+    # - vocabulary: ingredient -> bit, required / optional ingredients of a recipe as int bitmasks
+    # - inverted index: ingredient -> ids of recipes that require it
+    # - recipes bucketed by number of required ingredients (those are candidates
+    #   for "missing <= k" even when none of their ingredients are available)
+    # Building from a previous catalog keeps its vocabulary bits, so unchanged
+    # recipes reuse their normalized entry and mask instead of being re-parsed.
+    def __init__(self, recipes, previous=None, cache_size=128):
+        self.recipes = recipes
+        self.cache_size = cache_size
+        # LRU of query results, keyed by the available ingredient bitmask plus the query arguments
+        self.cache = OrderedDict()
+        self.cache_lock = threading.Lock()
+
+        self.required_masks = []
+        self.optional_masks = []
+        self.required_counts = []
+        self.inverted_index = {}
+        self.by_required_count = {}
+
+        if isinstance(recipes, RecipeStore):
+            self._build_store_index(recipes)
+        else:
+            self._build_index(recipes, previous)
+
+    def _build_index(self, recipes, previous):
+        reusable = {}
+        if previous is not None and previous.entry_keys is not None:
+            self.ingredients = list(previous.ingredients)
+            self.vocabulary = dict(previous.vocabulary)
+            reusable = previous.entry_keys
+        else:
+            self.ingredients = []
+            self.vocabulary = {}
+        self.entries = []
+        self.entry_keys = {}
+
+        for recipe_id, recipe in enumerate(recipes):
+            key = _recipe_key(recipe)
+            reused = reusable.get(key)
+            if reused is not None:
+                entry, mask, optional_mask = reused
+            else:
+                required = _normalize(recipe.get("required_ingredients", []))
+                entry = {
+                    "name": recipe.get("name"),
+                    "required_ingredients": required,
+                    "optional_ingredients": _normalize(recipe.get("optional_ingredients", [])),
+                    "url": recipe.get("url"),
+                }
+                mask = 0
+                for ing in required:
+                    mask |= 1 << self._ingredient_bit(ing)
+                optional_mask = 0
+                for ing in entry["optional_ingredients"]:
+                    optional_mask |= 1 << self._ingredient_bit(ing)
+
+            for ing in entry["required_ingredients"]:
+                self.inverted_index.setdefault(ing, []).append(recipe_id)
+            self.entries.append(entry)
+            self.entry_keys[key] = (entry, mask, optional_mask)
+            self.optional_masks.append(optional_mask)
+            self._add_counts(recipe_id, mask, len(entry["required_ingredients"]))
+
+    def _build_store_index(self, store):
+        # The store is already normalized: its ingredient ids are used as bits directly
+        # and names / urls stay in the memory-mapped blob until a recipe is returned.
+        self.ingredients = list(store.ingredients)
+        self.vocabulary = {ing: bit for bit, ing in enumerate(self.ingredients)}
+        self.entries = store
+        self.entry_keys = None
+
+        for recipe_id in range(len(store)):
+            required_ids = store.required_ids(recipe_id)
+            mask = 0
+            for bit in required_ids:
+                mask |= 1 << bit
+                self.inverted_index.setdefault(self.ingredients[bit], []).append(recipe_id)
+            optional_mask = 0
+            for bit in store.optional_ids(recipe_id):
+                optional_mask |= 1 << bit
+            self.optional_masks.append(optional_mask)
+            self._add_counts(recipe_id, mask, len(required_ids))
+
+    def _add_counts(self, recipe_id, mask, count):
+        self.required_masks.append(mask)
+        self.required_counts.append(count)
+        self.by_required_count.setdefault(count, []).append(recipe_id)
+
+    def _ingredient_bit(self, ingredient):
+        bit = self.vocabulary.get(ingredient)
+        if bit is None:
+            bit = self.vocabulary[ingredient] = len(self.ingredients)
+            self.ingredients.append(ingredient)
+        return bit
+
+    def available_mask(self, available_ingredients):
+        # Ingredients outside the catalog vocabulary cannot affect any recipe
+        mask = 0
+        for ing in available_ingredients:
+            bit = self.vocabulary.get(ing.lower())
+            if bit is not None:
+                mask |= 1 << bit
+        return mask
+
+    def cached(self, key, compute):
+        # Returns the memoized result for key, computing it outside the lock on a miss
+        with self.cache_lock:
+            cached = self.cache.get(key)
+            if cached is not None:
+                self.cache.move_to_end(key)
+                return cached
+        cached = compute()
+        with self.cache_lock:
+            self.cache[key] = cached
+            if len(self.cache) > self.cache_size:
+                self.cache.popitem(last=False)
+        return cached
+
+    def match(self, available_mask, max_missing):
+        # Returns (recipe id, missing bitmask, missing count) for every recipe missing
+        # at most max_missing required ingredients, in recipe id order.
+        return sorted(self.iter_matches(available_mask, max_missing))
+
+    def iter_matches(self, available_mask, max_missing):
+        # Same tuples as match() in no particular order, for callers that rank or
+        # group them anyway; only candidate recipes are visited.
+        hits = {}
+        for ing in self.ingredients_of(available_mask):
+            for recipe_id in self.inverted_index.get(ing, ()):
+                hits[recipe_id] = hits.get(recipe_id, 0) + 1
+
+        for recipe_id, count in hits.items():
+            missing_count = self.required_counts[recipe_id] - count
+            if missing_count <= max_missing:
+                yield recipe_id, self.required_masks[recipe_id] & ~available_mask, missing_count
+
+        # Recipes needing nothing on hand are candidates when they are small enough
+        for count, recipe_ids in self.by_required_count.items():
+            if count <= max_missing:
+                for recipe_id in recipe_ids:
+                    if recipe_id not in hits:
+                        yield recipe_id, self.required_masks[recipe_id], count
+
+    def best_purchases(self, available_mask, budget, results=5, max_nodes=200000):
+        # Best sets of at most `budget` ingredients to buy, by number of recipes they
+        # unlock: [(unlocked count, ingredient bitmask, recipe ids), ...], best first.
+        # Only recipes missing 1..budget ingredients can be unlocked; they are grouped
+        # by missing bitmask and searched depth-first, most useful ingredients first
+        # (so the first branch is the greedy answer), with a branch-and-bound cut:
+        # every recipe unlocked below a node needs one of the ingredients picked there,
+        # so the best `picks left` per-ingredient gains bound what the branch can add.
+        # max_nodes caps the search; the best sets found so far are returned.
+        needs = {}
+        for recipe_id, missing_mask, missing_count in self.iter_matches(available_mask, budget):
+            if missing_count:
+                needs.setdefault(missing_mask, []).append(recipe_id)
+        if not needs:
+            return []
+
+        need_bits = {need: self._bits(need) for need in needs}
+        counts = {need: len(recipe_ids) for need, recipe_ids in needs.items()}
+        usefulness = {}
+        for need, bits in need_bits.items():
+            for bit in bits:
+                usefulness[bit] = usefulness.get(bit, 0) + counts[need]
+        order = sorted(usefulness, key=lambda bit: (-usefulness[bit], bit))
+        position = {bit: i for i, bit in enumerate(order)}
+        need_positions = {need: sorted(position[bit] for bit in bits) for need, bits in need_bits.items()}
+        # reachable[i]: ingredients that may still be picked from position i on
+        reachable = [0] * (len(order) + 1)
+        for i in range(len(order) - 1, -1, -1):
+            reachable[i] = reachable[i + 1] | (1 << order[i])
+
+        best = []  # min-heap of (unlocked, -size, -bought mask, unlocked masks)
+        nodes = 0
+
+        def record(bought, size, unlocked, unlocked_union, unlocked_masks):
+            # Sets that include an ingredient no unlocked recipe needs are dominated by a subset
+            if unlocked and unlocked_union == bought:
+                entry = (unlocked, -size, -bought, unlocked_masks)
+                if len(best) < results:
+                    heapq.heappush(best, entry)
+                elif entry > best[0]:
+                    heapq.heapreplace(best, entry)
+
+        def search(bought, size, unlocked, unlocked_union, unlocked_masks, pending):
+            nonlocal nodes
+            nodes += 1
+            record(bought, size, unlocked, unlocked_union, unlocked_masks)
+            remaining = budget - size
+            if not remaining or not pending or nodes >= max_nodes:
+                return
+
+            if remaining == 1:
+                # Last pick: every pending recipe misses exactly one ingredient,
+                # so all the leaves are scored in one pass without copying `pending`
+                leaves = {}
+                for need, rest, _ in pending:
+                    leaf = leaves.get(rest)
+                    if leaf is None:
+                        leaves[rest] = [counts[need], need, (need,)]
+                    else:
+                        leaf[0] += counts[need]
+                        leaf[1] |= need
+                        leaf[2] += (need,)
+                for bit, (gained, union, masks) in leaves.items():
+                    record(bought | bit, size + 1, unlocked + gained, unlocked_union | union, unlocked_masks + masks)
+                nodes += len(leaves)
+                return
+
+            # Recipes each still useful ingredient moves closer to being unlocked
+            potential = {}
+            for need, rest, _ in pending:
+                for i in need_positions[need]:
+                    if rest >> order[i] & 1:
+                        potential[i] = potential.get(i, 0) + counts[need]
+            positions = sorted(potential)
+            bounds = [0] * len(positions)
+            top, total = [], 0
+            for k in range(len(positions) - 1, -1, -1):
+                gain = potential[positions[k]]
+                if len(top) < remaining:
+                    heapq.heappush(top, gain)
+                    total += gain
+                elif gain > top[0]:
+                    total += gain - heapq.heapreplace(top, gain)
+                bounds[k] = total
+
+            for k, i in enumerate(positions):
+                if len(best) == results and unlocked + bounds[k] <= best[0][0]:
+                    break
+                bit = 1 << order[i]
+                gained, union, masks, next_pending = 0, unlocked_union, unlocked_masks, []
+                for need, rest, missing in pending:
+                    if rest & bit:
+                        rest &= ~bit
+                        missing -= 1
+                        if not missing:
+                            gained += counts[need]
+                            union |= need
+                            masks = masks + (need,)
+                            continue
+                    # Still reachable with the picks left after this one
+                    if missing < remaining and rest & ~reachable[i + 1] == 0:
+                        next_pending.append((need, rest, missing))
+                search(bought | bit, size + 1, unlocked + gained, union, masks, next_pending)
+                if nodes >= max_nodes:
+                    return
+
+        search(0, 0, 0, 0, (), [(need, need, len(bits)) for need, bits in need_bits.items()])
+        ranked = sorted(best, reverse=True)
+        return [
+            (unlocked, -negative_mask, sorted(recipe_id for need in masks for recipe_id in needs[need]))
+            for unlocked, _, negative_mask, masks in ranked
+        ]
+
+    def _bits(self, mask):
+        # Positions of the set bits, lowest first (one step per set bit)
+        bits = []
+        while mask:
+            low = mask & -mask
+            bits.append(low.bit_length() - 1)
+            mask ^= low
+        return bits
+
+    def result(self, recipe_id, missing_mask, missing_count):
+        result = dict(self.entries[recipe_id])
+        result["missing_count"] = missing_count
+        result["missing_ingredients"] = self.ingredients_of(missing_mask)
+        return result
+
+    def ingredients_of(self, mask):
+        return [self.ingredients[bit] for bit in self._bits(mask)]
+
 
 class RecipeRecommender:
-    def __init__(self, recipes_file):
-        self.recipes = self._load_recipes(recipes_file)
+    def __init__(self, recipes_file, cache_size=128, use_store=True, watch=False, watch_interval=2.0):
+        self.recipes_file = recipes_file
+        self.cache_size = cache_size
+        # Prefer the compiled recipe_store next to the JSON file when it is up to date
+        self.use_store = use_store
+        self._reload_lock = threading.Lock()
+        self._catalog = RecipeCatalog([], cache_size=cache_size)
+        self.reload()
+
+        # Optionally pick up edits to the recipe file without restarting the app
+        self._watcher = None
+        if watch:
+            self._watcher = RecipeWatcher(self, watch_interval)
+            self._watcher.start()
+
+    @property
+    def recipes(self):
+        return self._catalog.recipes
+
+    @property
+    def vocabulary(self):
+        return self._catalog.vocabulary
+
+    @property
+    def ingredients(self):
+        return self._catalog.ingredients
+
+    def reload(self):
+        # Builds the new catalog off to the side and swaps it in with a single
+        # assignment, so queries running meanwhile keep using the old one. On a
+        # load error the previous good catalog stays in place; a compiled store
+        # that cannot be indexed falls back to the JSON file.
+        with self._reload_lock:
+            recipes = self._load_recipes(self.recipes_file)
+            catalog = self._build_catalog(recipes) if recipes is not None else None
+            if catalog is None and isinstance(recipes, RecipeStore):
+                recipes = self._load_json(self.recipes_file)
+                catalog = self._build_catalog(recipes) if recipes is not None else None
+            if catalog is None:
+                return False
+            self._catalog = catalog
+            return True
+
+    def _build_catalog(self, recipes):
+        # Returns None when the recipes cannot be indexed
+        try:
+            return RecipeCatalog(recipes, self._catalog, self.cache_size)
+        except (AttributeError, IndexError, KeyError, TypeError, ValueError) as e:
+            if isinstance(recipes, RecipeStore):
+                print(f"Error: Damaged recipe store '{recipes.store_path}' ({e}); reading '{self.recipes_file}'.")
+            else:
+                print(f"Error: Invalid recipe in '{self.recipes_file}' ({e}); keeping the previous recipes.")
+            return None
+
+    def close(self):
+        if self._watcher:
+            self._watcher.stop()
 
     def _load_recipes(self, recipes_file):
+        # Returns None when the file cannot be loaded
+        store = open_store(recipes_file) if self.use_store else None
+        if store is not None:
+            return store
+        return self._load_json(recipes_file)
+
+    def _load_json(self, recipes_file):
         try:
             with open(recipes_file, 'r', encoding='utf-8') as f:
-                return json.load(f)
+                recipes = json.load(f)
         except FileNotFoundError:
             print(f"Error: Recipe file '{recipes_file}' not found.")
-            return []
+            return None
         except json.JSONDecodeError:
             print(f"Error: Could not decode JSON from '{recipes_file}'.")
-            return []
+            return None
+        if not isinstance(recipes, list):
+            print(f"Error: Recipe file '{recipes_file}' does not contain a list of recipes.")
+            return None
+        return recipes
 
-    def get_recommendations(self, available_ingredients):
-        can_make_now = []
-        can_make_with_purchase = []
-
-        available_ingredients_lower = {ing.lower() for ing in available_ingredients}
-
-        for recipe in self.recipes:
-            recipe_name = recipe.get("name")
-            required_ingredients = {ing.lower() for ing in recipe.get("required_ingredients", [])}
-            optional_ingredients = {ing.lower() for ing in recipe.get("optional_ingredients", [])}
-            recipe_url = recipe.get("url")
-
-            missing_required = required_ingredients - available_ingredients_lower
-            
-            if not missing_required:
-                can_make_now.append({
-                    "name": recipe_name,
-                    "required_ingredients": list(required_ingredients),
-                    "optional_ingredients": list(optional_ingredients),
-                    "url": recipe_url,
-                    "missing_count": 0,
-                    "missing_ingredients": []
-                })
-            elif 1 <= len(missing_required) <= 2:
-                can_make_with_purchase.append({
-                    "name": recipe_name,
-                    "required_ingredients": list(required_ingredients),
-                    "optional_ingredients": list(optional_ingredients),
-                    "url": recipe_url,
-                    "missing_count": len(missing_required),
-                    "missing_ingredients": list(missing_required)
-                })
-        
+    def recommend(self, available_ingredients, max_missing=2):
+        # One pass produces both lists; results are memoized per inventory state
+        catalog = self._catalog
+        available_mask = catalog.available_mask(available_ingredients)
+
+        def compute():
+            can_make_now = []
+            can_make_with_purchase = []
+            for recipe_id, missing_mask, missing_count in catalog.match(available_mask, max_missing):
+                if missing_count == 0:
+                    can_make_now.append(catalog.result(recipe_id, missing_mask, missing_count))
+                else:
+                    can_make_with_purchase.append(catalog.result(recipe_id, missing_mask, missing_count))
+            return can_make_now, can_make_with_purchase
+
+        cached = catalog.cached((available_mask, max_missing), compute)
         return {
-            "can_make_now": can_make_now,
-            "can_make_with_purchase": can_make_with_purchase
+            "can_make_now": list(cached[0]),
+            "can_make_with_purchase": list(cached[1])
         }
 
-    def get_recommendations_with_missing(self, available_ingredients):
-        can_make_with_purchase = []
-        available_ingredients_lower = {ing.lower() for ing in available_ingredients}
-
-        for recipe in self.recipes:
-            recipe_name = recipe.get("name")
-            required_ingredients = {ing.lower() for ing in recipe.get("required_ingredients", [])}
-            optional_ingredients = {ing.lower() for ing in recipe.get("optional_ingredients", [])}
-            recipe_url = recipe.get("url")
-
-            # Compares current available ingredients with required ingredients to find missing ones.
-            missing_required = required_ingredients - available_ingredients_lower
-            
-            # Finds recipes that are missing 1 or 2 required ingredients.
-            if 1 <= len(missing_required) <= 2:
-                can_make_with_purchase.append({
-                    "name": recipe_name,
-                    "required_ingredients": list(required_ingredients),
-                    "optional_ingredients": list(optional_ingredients),
-                    "url": recipe_url,
-                    "missing_count": len(missing_required),
-                    "missing_ingredients": list(missing_required) # Specifies which ingredients are missing.
+    def top_k(self, available_ingredients, k=10, max_missing=2, min_missing=0, elapsed_seconds=None,
+              missing_weight=1.0, optional_weight=0.5, urgency_weight=0.5, urgency_seconds=3 * 24 * 3600):
+        # The k best recipes missing min_missing..max_missing required ingredients, best first.
+        # score = optional_weight * share of the optional ingredients on hand
+        #       - missing_weight * missing required ingredients
+        #       + urgency_weight * sum of min(1, elapsed / urgency_seconds) over the fridge items it uses
+        # elapsed_seconds is {food: seconds in the fridge}. Candidates are streamed
+        # through a size-k heap, so only the k returned recipes are materialized.
+        # Per-item urgency is rounded to 1/URGENCY_STEPS, so the ranking is memoized
+        # and only recomputed when the inventory changes or an item ages a step.
+        catalog = self._catalog
+        available_mask = catalog.available_mask(available_ingredients)
+        steps = {}
+        for ing, seconds in (elapsed_seconds or {}).items():
+            bit = catalog.vocabulary.get(ing.lower())
+            if bit is not None and seconds > 0:
+                steps[1 << bit] = round(min(1.0, seconds / urgency_seconds) * URGENCY_STEPS)
+        urgency = sorted((bit, step / URGENCY_STEPS) for bit, step in steps.items() if step)
+        key = ("top_k", available_mask, k, max_missing, min_missing,
+               missing_weight, optional_weight, urgency_weight, tuple(urgency))
+
+        def scored():
+            for recipe_id, missing_mask, missing_count in catalog.iter_matches(available_mask, max_missing):
+                if missing_count < min_missing:
+                    continue
+                optional_mask = catalog.optional_masks[recipe_id]
+                coverage = 0.0
+                if optional_mask:
+                    coverage = _popcount(optional_mask & available_mask) / _popcount(optional_mask)
+                used = (catalog.required_masks[recipe_id] | optional_mask) & available_mask
+                score = optional_weight * coverage - missing_weight * missing_count
+                if urgency and used:
+                    score += urgency_weight * sum(weight for bit, weight in urgency if used & bit)
+                # -recipe_id breaks ties in catalog order
+                yield score, -recipe_id, missing_mask, missing_count, coverage
+
+        def compute():
+            ranked = []
+            for score, neg_id, missing_mask, missing_count, coverage in heapq.nlargest(k, scored()):
+                result = catalog.result(-neg_id, missing_mask, missing_count)
+                result["score"] = round(score, 4)
+                result["optional_coverage"] = round(coverage, 4)
+                ranked.append(result)
+            return ranked
+
+        return list(catalog.cached(key, compute))
+
+    def shopping_list(self, available_ingredients, budget=2, results=5, recipes_per_set=10):
+        # Answers "which `budget` items should I buy to unlock the most recipes":
+        # [{"buy": [...], "unlocks": n, "recipes": [first recipe names]}, ...], best first.
+        # The search is memoized per inventory state like recommend().
+        catalog = self._catalog
+        available_mask = catalog.available_mask(available_ingredients)
+
+        def compute():
+            suggestions = []
+            for unlocked, mask, recipe_ids in catalog.best_purchases(available_mask, budget, results):
+                suggestions.append({
+                    "buy": catalog.ingredients_of(mask),
+                    "unlocks": unlocked,
+                    "recipes": [catalog.entries[recipe_id]["name"] for recipe_id in recipe_ids[:recipes_per_set]],
                 })
-        
-        return can_make_with_purchase
+            return suggestions
+
+        return list(catalog.cached(("shopping", available_mask, budget, results, recipes_per_set), compute))
+
+    def get_recommendations(self, available_ingredients, max_missing=2):
+        return self.recommend(available_ingredients, max_missing)
+
+    def get_recommendations_with_missing(self, available_ingredients, max_missing=2):
+        # Finds recipes that are missing between 1 and max_missing required ingredients.
+        return self.recommend(available_ingredients, max_missing)["can_make_with_purchase"]
+
+
+class RecipeWatcher(threading.Thread):
+    # Polls the recipe file's modification time / size and reloads on change
+    def __init__(self, recommender, interval=2.0):
+        super().__init__(daemon=True)
+        self.recommender = recommender
+        self.interval = interval
+        self._stop_event = threading.Event()
+        self._signature = self._file_signature()
+
+    def _file_signature(self):
+        try:
+            stat = os.stat(self.recommender.recipes_file)
+            return stat.st_mtime_ns, stat.st_size
+        except OSError:
+            return None
+
+    def run(self):
+        while not self._stop_event.wait(self.interval):
+            signature = self._file_signature()
+            if signature is not None and signature != self._signature:
+                self._signature = signature
+                # A bad edit must not end the watcher: the next fixed save is picked up again
+                try:
+                    self.recommender.reload()
+                except Exception as e:
+                    print(f"Error: Reloading recipes failed ({e}).")
+
+    def stop(self):
+        self._stop_event.set()
+
+
+def _popcount(mask):
+    return bin(mask).count("1")
+
+
+def _normalize(ingredients):
+    # Lowercase and drop duplicates, keeping the catalog order
+    return list(dict.fromkeys(ing.lower() for ing in ingredients))
+
+
+def _recipe_key(recipe):
+    # Identifies an unchanged catalog entry between reloads
+    return (
+        recipe.get("name"),
+        tuple(recipe.get("required_ingredients", [])),
+        tuple(recipe.get("optional_ingredients", [])),
+        recipe.get("url"),
+    )
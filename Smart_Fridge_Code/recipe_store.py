@@ -0,0 +1,168 @@
+import json
+import mmap
+import os
+import struct
+import sys
+from array import array
+
+# Compact, memory-mapped form of recipes.json.
+#
+# Layout (all integers are uint32 in the byte order recorded in the header):
+#   header       MAGIC, version, byte order, recipe count, ingredient count, id counts, blob size
+#   str_offsets  (ingredients + 2 * recipes + 1) offsets into the UTF-8 string blob;
+#                strings are the ingredient vocabulary, then name / url of every recipe
+#   req_offsets  (recipes + 1) offsets into req_ids, the required ingredient ids
+#   opt_offsets  (recipes + 1) offsets into opt_ids, the optional ingredient ids
+#   flags        one per recipe: HAS_NAME / HAS_URL, so a missing value and "" stay distinct
+#   blob         UTF-8 strings
+MAGIC = b"RCPS"
+VERSION = 2
+HAS_NAME = 1
+HAS_URL = 2
+HEADER = struct.Struct("<4sHcxIIIII")
+
+
+def store_path_for(recipes_file):
+    return os.path.splitext(recipes_file)[0] + ".bin"
+
+
+def compile_recipes(recipes_file, store_path=None):
+    store_path = store_path or store_path_for(recipes_file)
+    with open(recipes_file, 'r', encoding='utf-8') as f:
+        recipes = json.load(f)
+
+    vocabulary = {}
+    req_offsets, req_ids = array('I', [0]), array('I')
+    opt_offsets, opt_ids = array('I', [0]), array('I')
+    flags = array('I')
+    recipe_strings = []
+    for recipe in recipes:
+        for key, offsets, ids in (("required_ingredients", req_offsets, req_ids),
+                                  ("optional_ingredients", opt_offsets, opt_ids)):
+            for ing in dict.fromkeys(ing.lower() for ing in recipe.get(key, [])):
+                ids.append(vocabulary.setdefault(ing, len(vocabulary)))
+            offsets.append(len(ids))
+        name, url = recipe.get("name"), recipe.get("url")
+        flags.append((HAS_NAME if name is not None else 0) | (HAS_URL if url is not None else 0))
+        recipe_strings.append(name if name is not None else "")
+        recipe_strings.append(url if url is not None else "")
+
+    blob = bytearray()
+    str_offsets = array('I', [0])
+    for text in list(vocabulary) + recipe_strings:
+        blob += text.encode('utf-8')
+        str_offsets.append(len(blob))
+
+    header = HEADER.pack(MAGIC, VERSION, sys.byteorder[0].encode(), len(recipes), len(vocabulary),
+                         len(req_ids), len(opt_ids), len(blob))
+    tmp_path = store_path + ".tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(header)
+        for section in (str_offsets, req_offsets, req_ids, opt_offsets, opt_ids, flags):
+            section.tofile(f)
+        f.write(blob)
+    os.replace(tmp_path, store_path)
+    return store_path
+
+
+class RecipeStore:
+    # Read-only, lazily decoded view over a compiled store. Behaves like the list
+    # of recipe dicts (len / index) with ingredients already normalized.
+    def __init__(self, store_path):
+        self.store_path = store_path
+        with open(store_path, 'rb') as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        try:
+            self._map_sections()
+        except (struct.error, ValueError):
+            self._mm.close()
+            raise ValueError(f"Unsupported or damaged recipe store '{store_path}'.") from None
+
+    def _map_sections(self):
+        # A truncated or half-written file must not load with cut strings or ids:
+        # the size has to match the header exactly and every offset table has to
+        # end at the size of the section it indexes
+        magic, version, byteorder, self._count, ingredient_count, req_count, opt_count, blob_size = \
+            HEADER.unpack_from(self._mm, 0)
+        if magic != MAGIC or version != VERSION or byteorder != sys.byteorder[0].encode():
+            raise ValueError("unsupported format")
+        lengths = (ingredient_count + 2 * self._count + 1, self._count + 1, req_count,
+                   self._count + 1, opt_count, self._count)
+        if len(self._mm) != HEADER.size + 4 * sum(lengths) + blob_size:
+            raise ValueError("size does not match the header")
+
+        starts = [HEADER.size]
+        for length in lengths:
+            starts.append(starts[-1] + 4 * length)
+        # Everything that can fail is read before any view of the map is exported,
+        # so the map can still be closed: last entry of the string / required /
+        # optional offset tables, then the ingredient vocabulary
+        ends = [struct.unpack_from("=I", self._mm, starts[i + 1] - 4)[0] for i in (0, 1, 3)]
+        if ends != [blob_size, req_count, opt_count]:
+            raise ValueError("offset tables do not match the sections")
+
+        vocabulary_offsets = struct.unpack_from(f"={ingredient_count + 1}I", self._mm, starts[0])
+        blob_start = starts[-1]
+        self.ingredients = [
+            str(self._mm[blob_start + start:blob_start + end], 'utf-8')
+            for start, end in zip(vocabulary_offsets, vocabulary_offsets[1:])
+        ]
+
+        view = memoryview(self._mm)
+        sections = [view[start:start + 4 * length].cast('I') for start, length in zip(starts, lengths)]
+        self._str_offsets, self._req_offsets, self._req_ids, self._opt_offsets, self._opt_ids, self._flags = sections
+        self._blob = view[blob_start:blob_start + blob_size]
+        self._ingredient_count = ingredient_count
+
+    def __len__(self):
+        return self._count
+
+    def __getitem__(self, recipe_id):
+        if not 0 <= recipe_id < self._count:
+            raise IndexError(recipe_id)
+        return {
+            "name": self.name(recipe_id),
+            "required_ingredients": [self.ingredients[i] for i in self.required_ids(recipe_id)],
+            "optional_ingredients": [self.ingredients[i] for i in self.optional_ids(recipe_id)],
+            "url": self.url(recipe_id),
+        }
+
+    def __iter__(self):
+        return (self[recipe_id] for recipe_id in range(self._count))
+
+    def name(self, recipe_id):
+        # None only when the recipe had no name; an empty name stays ""
+        if not self._flags[recipe_id] & HAS_NAME:
+            return None
+        return self._string(self._ingredient_count + 2 * recipe_id)
+
+    def url(self, recipe_id):
+        if not self._flags[recipe_id] & HAS_URL:
+            return None
+        return self._string(self._ingredient_count + 2 * recipe_id + 1)
+
+    def required_ids(self, recipe_id):
+        return self._req_ids[self._req_offsets[recipe_id]:self._req_offsets[recipe_id + 1]]
+
+    def optional_ids(self, recipe_id):
+        return self._opt_ids[self._opt_offsets[recipe_id]:self._opt_offsets[recipe_id + 1]]
+
+    def _string(self, string_id):
+        return str(self._blob[self._str_offsets[string_id]:self._str_offsets[string_id + 1]], 'utf-8')
+
+
+def open_store(recipes_file):
+    # The compiled store if it exists and is not older than the JSON source, else None
+    store_path = store_path_for(recipes_file)
+    try:
+        if os.path.exists(recipes_file) and os.path.getmtime(store_path) < os.path.getmtime(recipes_file):
+            return None
+        return RecipeStore(store_path)
+    except (OSError, ValueError):
+        return None
+
+
+if __name__ == "__main__":
+    source = sys.argv[1] if len(sys.argv) > 1 else "recipes.json"
+    print(f"Compiled {source} -> {compile_recipes(source)}")
@@ -1,7 +1,9 @@
-from PyQt5.QtWidgets import QDialog, QVBoxLayout, QLabel, QListWidget, QListWidgetItem, QSizePolicy
+from PyQt5.QtWidgets import QDialog, QVBoxLayout, QLabel, QLineEdit, QListView, QSizePolicy
 from PyQt5.QtCore import Qt, QUrl
 from PyQt5.QtGui import QDesktopServices
 
+from recipe_models import RecipeListModel
+
 class RecipeWindow(QDialog):
     def __init__(self, parent=None):
         super().__init__(parent)
@@ -15,40 +17,40 @@ class RecipeWindow(QDialog):
         self.title_label_now.setStyleSheet("font-size: 18px; font-weight: bold; margin-bottom: 5px; color: #333;")
         main_layout.addWidget(self.title_label_now)
 
-        self.recipe_list_widget_now = QListWidget(self)
-        self.recipe_list_widget_now.itemClicked.connect(self.open_recipe_url)
-        self.recipe_list_widget_now.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Expanding)
-        main_layout.addWidget(self.recipe_list_widget_now)
+        # Filters by recipe name or ingredient as you type
+        self.filter_edit = QLineEdit(self)
+        self.filter_edit.setPlaceholderText("Filter by recipe or ingredient")
+        self.filter_edit.textChanged.connect(self.apply_filter)
+        main_layout.addWidget(self.filter_edit)
+
+        self.empty_label = QLabel("No recipes can be made with your current ingredients.", self)
+        self.empty_label.hide()
+        main_layout.addWidget(self.empty_label)
+
+        # Rows are formatted lazily by the model, only for the visible part of the list
+        self.recipe_model = RecipeListModel(self)
+        self.recipe_list_view_now = QListView(self)
+        self.recipe_list_view_now.setModel(self.recipe_model)
+        self.recipe_list_view_now.setUniformItemSizes(True)
+        self.recipe_list_view_now.clicked.connect(self.open_recipe_url)
+        self.recipe_list_view_now.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Expanding)
+        main_layout.addWidget(self.recipe_list_view_now)
 
         self.setLayout(main_layout)
 
-        # List to store all recipe data
-        self.all_recipes_data = [] 
-
     def update_recipes(self, recommendations):
-        self.recipe_list_widget_now.clear()
-        self.all_recipes_data = []
-
         can_make_now = recommendations.get("can_make_now", [])
+        self.recipe_model.set_recipes(can_make_now)
+        # Only the ranked rows handed over are searched, not the whole catalog
+        self.filter_edit.setPlaceholderText(f"Filter the {len(can_make_now)} best ranked recipes by name or ingredient")
+        self.empty_label.setVisible(not can_make_now)
 
-        # Add recipes that can be made with current ingredients
-        if can_make_now:
-            for recipe in can_make_now:
-                ingredients_text = f"Required: {', '.join(recipe.get('required_ingredients', []))}"
-                if recipe.get('optional_ingredients'):
-                    ingredients_text += f" | Optional: {', '.join(recipe['optional_ingredients'])}"
-                
-                item_text = f"• {recipe['name']} ({ingredients_text})"
-                list_item = QListWidgetItem(item_text)
-                self.recipe_list_widget_now.addItem(list_item)
-                list_item.setData(Qt.UserRole, recipe)
-        else:
-            list_item = QListWidgetItem("No recipes can be made with your current ingredients.")
-            self.recipe_list_widget_now.addItem(list_item)
+    def apply_filter(self, text):
+        self.recipe_model.set_filter(text)
+
+    def open_recipe_url(self, index):
+        recipe = index.data(Qt.UserRole)
 
-    def open_recipe_url(self, item):
-        recipe = item.data(Qt.UserRole) 
-        
         if recipe: # If valid recipe data exists
             url = recipe.get("url")
             if url:
@@ -0,0 +1,28 @@
+from PyQt5.QtCore import QObject, QRunnable, pyqtSignal
+
+
+class ShoppingListSignals(QObject):
+    # (request id, suggestions); QRunnable is not a QObject, so it emits through this
+    finished = pyqtSignal(int, object)
+
+
+class ShoppingListTask(QRunnable):
+    # Runs RecipeRecommender.shopping_list on a QThreadPool thread: the purchase
+    # search can take most of a second on a large catalog and must not stall the GUI.
+    # The request id lets the receiver drop results of clicks that were superseded.
+    def __init__(self, recommender, request_id, available_ingredients, budget, results):
+        super().__init__()
+        self.recommender = recommender
+        self.request_id = request_id
+        self.available_ingredients = list(available_ingredients)
+        self.budget = budget
+        self.results = results
+        self.signals = ShoppingListSignals()
+
+    def run(self):
+        try:
+            suggestions = self.recommender.shopping_list(self.available_ingredients, self.budget, self.results)
+        except Exception as e:
+            print(f"Error: Shopping list failed ({e}).")
+            suggestions = []
+        self.signals.finished.emit(self.request_id, suggestions)
@@ -0,0 +1,114 @@
+import json
+
+import cv2
+import numpy as np
+
+from postprocess import Detections
+
+
+class ShelfZone:
+    # A region of interest in relative coordinates (0..1) of the frame. Detection
+    # runs on the crop, optionally split into tiles_x * tiles_y overlapping tiles,
+    # each resized so its longest side is input_size pixels; the model then runs
+    # at that input size (model_input_size) instead of its default 640.
+    def __init__(self, name, rect, tiles=(1, 1), input_size=None, overlap=0.1):
+        self.name = name
+        self.rect = tuple(rect)
+        self.tiles = tuple(tiles)
+        self.input_size = input_size
+        self.overlap = overlap
+
+    def regions(self, width, height):
+        # Pixel (x1, y1, x2, y2) of every tile of this zone
+        zx1, zy1, zx2, zy2 = self.rect
+        zx1, zx2 = int(zx1 * width), int(zx2 * width)
+        zy1, zy2 = int(zy1 * height), int(zy2 * height)
+        tiles_x, tiles_y = self.tiles
+        tile_w, tile_h = (zx2 - zx1) / tiles_x, (zy2 - zy1) / tiles_y
+        pad_x, pad_y = int(tile_w * self.overlap / 2), int(tile_h * self.overlap / 2)
+
+        regions = []
+        for ty in range(tiles_y):
+            for tx in range(tiles_x):
+                x1 = max(zx1, int(zx1 + tx * tile_w) - pad_x)
+                y1 = max(zy1, int(zy1 + ty * tile_h) - pad_y)
+                x2 = min(zx2, int(zx1 + (tx + 1) * tile_w) + pad_x)
+                y2 = min(zy2, int(zy1 + (ty + 1) * tile_h) + pad_y)
+                regions.append((x1, y1, x2, y2))
+        return regions
+
+
+def model_input_size(input_size):
+    # YOLO input sides are multiples of the 32 px stride; None keeps the model default
+    if not input_size:
+        return None
+    return max(32, -(-int(input_size) // 32) * 32)
+
+
+def load_zones(path):
+    # [{"name": "top", "rect": [0, 0, 1, 0.33], "tiles": [2, 1], "input_size": 640}, ...]
+    with open(path, 'r', encoding='utf-8') as f:
+        return [
+            ShelfZone(zone["name"], zone["rect"], zone.get("tiles", (1, 1)), zone.get("input_size"),
+                      zone.get("overlap", 0.1))
+            for zone in json.load(f)
+        ]
+
+
+def crop_zones(frame, zones):
+    # Returns the crops to run detection on and, per crop, (zone index, x offset, y offset, scale)
+    height, width = frame.shape[:2]
+    crops, placements = [], []
+    for zone_index, zone in enumerate(zones):
+        for x1, y1, x2, y2 in zone.regions(width, height):
+            if x2 <= x1 or y2 <= y1:
+                continue
+            crop = frame[y1:y2, x1:x2]
+            scale = 1.0
+            if zone.input_size:
+                scale = zone.input_size / max(x2 - x1, y2 - y1)
+                crop = cv2.resize(crop, (max(1, round((x2 - x1) * scale)), max(1, round((y2 - y1) * scale))),
+                                  interpolation=cv2.INTER_AREA if scale < 1 else cv2.INTER_LINEAR)
+            crops.append(crop)
+            placements.append((zone_index, x1, y1, scale))
+    return crops, placements
+
+
+def merge_zone_detections(parts, placements, zones, iou_threshold=0.5):
+    # Maps crop detections back to frame coordinates, removes duplicates from
+    # overlapping tiles (class-aware NMS) and tags every box with its zone name
+    xyxy, conf, class_ids, names, zone_names = [], [], [], [], []
+    for detections, (zone_index, offset_x, offset_y, scale) in zip(parts, placements):
+        if not detections.names:
+            continue
+        boxes = detections.xyxy.astype(np.float32) / scale
+        boxes[:, [0, 2]] += offset_x
+        boxes[:, [1, 3]] += offset_y
+        xyxy.append(boxes)
+        conf.append(detections.conf)
+        class_ids.append(detections.class_ids)
+        names.extend(detections.names)
+        zone_names.extend([zones[zone_index].name] * len(detections.names))
+
+    if not names:
+        return Detections(np.empty((0, 4), dtype=np.int32), np.empty(0, dtype=np.float32),
+                          np.empty(0, dtype=np.int32), [], [])
+
+    xyxy, conf, class_ids = np.concatenate(xyxy), np.concatenate(conf), np.concatenate(class_ids)
+    shifted = xyxy + class_ids[:, None].astype(np.float32) * 7680
+    boxes = np.column_stack([shifted[:, :2], shifted[:, 2:] - shifted[:, :2]])
+    keep = np.array(cv2.dnn.NMSBoxes(boxes.tolist(), conf.tolist(), 0.0, iou_threshold), dtype=np.int64).reshape(-1)
+    return Detections(
+        xyxy[keep].astype(np.int32), conf[keep], class_ids[keep],
+        [names[i] for i in keep.tolist()], [zone_names[i] for i in keep.tolist()],
+    )
+
+
+def draw_zones(frame, zones):
+    height, width = frame.shape[:2]
+    for zone in zones:
+        x1, y1, x2, y2 = zone.rect
+        top_left = (int(x1 * width), int(y1 * height))
+        cv2.rectangle(frame, top_left, (int(x2 * width), int(y2 * height)), (255, 128, 0), 1)
+        cv2.putText(frame, zone.name, (top_left[0] + 5, top_left[1] + 20),
+                    cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255, 128, 0), 2)
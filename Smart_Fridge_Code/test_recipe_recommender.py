@@ -0,0 +1,52 @@
+import random
+from itertools import combinations
+
+from recipe_recommender import RecipeCatalog
+
+
+def random_catalog(rng, recipe_count, vocabulary_size):
+    vocabulary = [f"ingredient_{i}" for i in range(vocabulary_size)]
+    recipes = [
+        {
+            "name": f"recipe_{i}",
+            "required_ingredients": rng.sample(vocabulary, rng.randint(1, 5)),
+            "optional_ingredients": rng.sample(vocabulary, rng.randint(0, 2)),
+        }
+        for i in range(recipe_count)
+    ]
+    return RecipeCatalog(recipes), vocabulary
+
+
+def brute_force_best(catalog, available_mask, budget):
+    # Most recipes unlocked by any set of at most `budget` missing ingredients
+    missing = [mask & ~available_mask for mask in catalog.required_masks]
+    candidates = sorted({bit for mask in missing if mask for bit in catalog._bits(mask)})
+    best = 0
+    for size in range(1, budget + 1):
+        for bits in combinations(candidates, size):
+            bought = sum(1 << bit for bit in bits)
+            best = max(best, sum(1 for mask in missing if mask and mask & ~bought == 0))
+    return best
+
+
+def test_best_purchases_matches_brute_force():
+    rng = random.Random(7)
+    for _ in range(20):
+        catalog, vocabulary = random_catalog(rng, 500, rng.randint(18, 30))
+        available_mask = catalog.available_mask(rng.sample(vocabulary, rng.randint(0, 10)))
+        for budget in (1, 2, 3):
+            found = catalog.best_purchases(available_mask, budget, results=3)
+            expected = brute_force_best(catalog, available_mask, budget)
+            assert (found[0][0] if found else 0) == expected
+
+
+def test_best_purchases_reports_the_recipes_it_unlocks():
+    rng = random.Random(11)
+    catalog, vocabulary = random_catalog(rng, 300, 20)
+    available_mask = catalog.available_mask(rng.sample(vocabulary, 6))
+    for unlocked, bought, recipe_ids in catalog.best_purchases(available_mask, 2, results=5):
+        assert bin(bought).count("1") <= 2
+        assert len(recipe_ids) == unlocked
+        for recipe_id in recipe_ids:
+            missing = catalog.required_masks[recipe_id] & ~available_mask
+            assert missing and missing & ~bought == 0
@@ -0,0 +1,62 @@
+import json
+import os
+
+from recipe_recommender import RecipeRecommender
+from recipe_store import compile_recipes, open_store, store_path_for
+
+RECIPES = [
+    {"name": "Omelette", "required_ingredients": ["Egg", "milk"], "optional_ingredients": ["onion"],
+     "url": "https://example.com/omelette"},
+    {"name": "Fried egg", "required_ingredients": ["egg"], "url": ""},
+    {"name": None, "required_ingredients": ["carrot", "egg", "egg"]},
+    {"name": "", "required_ingredients": [], "optional_ingredients": ["Milk"], "url": "https://example.com/x"},
+    {"name": "Carrot salad", "required_ingredients": ["carrot", "onion", "apple"]},
+]
+AVAILABLE = ["egg", "carrot"]
+
+
+def write_recipes(tmp_path):
+    recipes_file = str(tmp_path / "recipes.json")
+    with open(recipes_file, 'w', encoding='utf-8') as f:
+        json.dump(RECIPES, f)
+    return recipes_file
+
+
+def results(recipes_file, use_store):
+    recommender = RecipeRecommender(recipes_file, use_store=use_store)
+    return recommender.recommend(AVAILABLE), recommender.top_k(AVAILABLE, 10), recommender.shopping_list(AVAILABLE)
+
+
+def test_store_matches_json(tmp_path):
+    recipes_file = write_recipes(tmp_path)
+    compile_recipes(recipes_file)
+    store = open_store(recipes_file)
+    assert store is not None
+    assert [store.name(i) for i in range(len(store))] == [recipe.get("name") for recipe in RECIPES]
+    assert [store.url(i) for i in range(len(store))] == [recipe.get("url") for recipe in RECIPES]
+    assert results(recipes_file, True) == results(recipes_file, False)
+
+
+def test_truncated_store_falls_back_to_json(tmp_path):
+    recipes_file = write_recipes(tmp_path)
+    store_path = compile_recipes(recipes_file)
+    with open(store_path, 'rb') as f:
+        data = f.read()
+    expected = results(recipes_file, False)
+    newer = os.path.getmtime(recipes_file) + 10
+
+    for size in range(len(data)):
+        with open(store_path, 'wb') as f:
+            f.write(data[:size])
+        os.utime(store_path, (newer, newer))
+        assert open_store(recipes_file) is None, size
+        assert results(recipes_file, True) == expected, size
+
+
+def test_store_with_trailing_bytes_is_rejected(tmp_path):
+    recipes_file = write_recipes(tmp_path)
+    store_path = compile_recipes(recipes_file)
+    with open(store_path, 'ab') as f:
+        f.write(b"\0\0\0\0")
+    assert store_path == store_path_for(recipes_file)
+    assert open_store(recipes_file) is None
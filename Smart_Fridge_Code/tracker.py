@@ -0,0 +1,103 @@
+from collections import deque
+
+import numpy as np
+
+
+class PresenceTracker:
+    # Per-class hysteresis on top of raw detections: a food must be seen in
+    # appear_hits of the last appear_window frames to appear, and must be missing
+    # for longer than grace_seconds to disappear. A single missed frame therefore
+    # neither removes the item nor resets its registration time.
+    def __init__(self, appear_hits=3, appear_window=5, grace_seconds=3.0):
+        self.appear_hits = appear_hits
+        self.appear_window = appear_window
+        self.grace_seconds = grace_seconds
+        self._history = {}
+        self._last_seen = {}
+        self._present = set()
+
+    def update(self, detected, current_time):
+        # Returns the set of foods considered present after this frame
+        for food in detected:
+            self._last_seen[food] = current_time
+
+        for food in set(self._history) | set(detected):
+            history = self._history.get(food)
+            if history is None:
+                history = self._history[food] = deque(maxlen=self.appear_window)
+            history.append(food in detected)
+
+            if food not in self._present:
+                if sum(history) >= self.appear_hits:
+                    self._present.add(food)
+            elif food not in detected:
+                missing = (current_time - self._last_seen[food]).total_seconds()
+                if missing > self.grace_seconds:
+                    self._present.discard(food)
+
+            if food not in self._present and not any(history):
+                del self._history[food]
+
+        return set(self._present)
+
+
+class InstanceTracker:
+    # Greedy IoU association of boxes of the same class across frames, so the
+    # number of instances of a food (e.g. three eggs) is stable too. Tracks that
+    # are not matched survive for max_missed frames.
+    def __init__(self, iou_threshold=0.3, max_missed=5):
+        self.iou_threshold = iou_threshold
+        self.max_missed = max_missed
+        self._tracks = {}
+        self._next_id = 0
+
+    def update(self, detections):
+        # detections: postprocess.Detections; returns {class name: live track count}
+        matched = set()
+        for cls_name in set(detections.names) | {track[0] for track in self._tracks.values()}:
+            rows = [i for i, name in enumerate(detections.names) if name == cls_name]
+            track_ids = [tid for tid, track in self._tracks.items() if track[0] == cls_name]
+            boxes = detections.xyxy[rows] if rows else np.empty((0, 4))
+            used = set()
+
+            if track_ids and rows:
+                ious = box_iou(np.array([self._tracks[tid][1] for tid in track_ids]), boxes)
+                for t, d in zip(*np.unravel_index(np.argsort(-ious, axis=None), ious.shape)):
+                    if ious[t, d] < self.iou_threshold:
+                        break
+                    if track_ids[t] in matched or d in used:
+                        continue
+                    self._tracks[track_ids[t]] = [cls_name, boxes[d], 0]
+                    matched.add(track_ids[t])
+                    used.add(d)
+
+            for d in range(len(rows)):
+                if d not in used:
+                    self._tracks[self._next_id] = [cls_name, boxes[d], 0]
+                    matched.add(self._next_id)
+                    self._next_id += 1
+
+        for tid in list(self._tracks):
+            if tid not in matched:
+                self._tracks[tid][2] += 1
+                if self._tracks[tid][2] > self.max_missed:
+                    del self._tracks[tid]
+
+        counts = {}
+        for cls_name, _, _ in self._tracks.values():
+            counts[cls_name] = counts.get(cls_name, 0) + 1
+        return counts
+
+
+def box_iou(a, b):
+    # Pairwise IoU of (N, 4) and (M, 4) xyxy boxes -> (N, M)
+    a = a.astype(np.float32)
+    b = b.astype(np.float32)
+    x1 = np.maximum(a[:, None, 0], b[None, :, 0])
+    y1 = np.maximum(a[:, None, 1], b[None, :, 1])
+    x2 = np.minimum(a[:, None, 2], b[None, :, 2])
+    y2 = np.minimum(a[:, None, 3], b[None, :, 3])
+    inter = np.clip(x2 - x1, 0, None) * np.clip(y2 - y1, 0, None)
+    area_a = (a[:, 2] - a[:, 0]) * (a[:, 3] - a[:, 1])
+    area_b = (b[:, 2] - b[:, 0]) * (b[:, 3] - b[:, 1])
+    return inter / np.maximum(area_a[:, None] + area_b[None, :] - inter, 1e-6)